@@ -8,13 +8,17 @@ variables using Pydantic Settings. It supports multiple environments
 
 import logging
 import os
-from functools import lru_cache
-from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = logging.getLogger(__name__)
 
+# Maps BOT_ENV values to the .env file loaded for that environment
+ENV_FILES = {
+    "production": ".env",
+    "staging": ".env.staging",
+}
+
 
 def get_env_file() -> str | None:
     """
@@ -26,15 +30,11 @@ def get_env_file() -> str | None:
             - "staging" -> ".env.staging" (if exists)
     """
     env = os.getenv("BOT_ENV", "production")
-    env_files = {
-        "production": ".env",
-        "staging": ".env.staging",
-    }
-    env_file = env_files.get(env, ".env")
+    env_file = ENV_FILES.get(env, ".env")
     
     # Return path only if file exists, otherwise return None
     # Pydantic will load from environment variables if no .env file
-    if Path(env_file).exists():
+    if os.path.isfile(env_file):
         logger.debug(f"Loading configuration from: {env_file}")
         return env_file
     else:
@@ -57,6 +57,9 @@ class Settings(BaseSettings):
         rules_link: URL to group rules message.
         captcha_enabled: Feature flag to enable/disable captcha verification.
         captcha_timeout: Seconds before auto-ban if user doesn't verify.
+        webhook_url: Public HTTPS base URL for webhook mode; polling is used
+            when unset.
+        webhook_port: Local port the webhook server listens on.
     """
 
     telegram_bot_token: str
@@ -69,35 +72,66 @@ class Settings(BaseSettings):
     rules_link: str = "https://t.me/pythonID/290029/321799"
     captcha_enabled: bool = False
     captcha_timeout_seconds: int = 120
+    webhook_url: str | None = None
+    webhook_port: int = 8443
 
     model_config = SettingsConfigDict(
         env_file=get_env_file(),
         env_file_encoding="utf-8",
+        frozen=True,
     )
 
     def model_post_init(self, __context):
         """Log non-sensitive configuration values after initialization."""
         logger.info("Configuration loaded successfully")
-        logger.debug(f"group_id: {self.group_id}")
-        logger.debug(f"warning_topic_id: {self.warning_topic_id}")
-        logger.debug(f"restrict_failed_users: {self.restrict_failed_users}")
-        logger.debug(f"warning_threshold: {self.warning_threshold}")
-        logger.debug(f"warning_time_threshold_minutes: {self.warning_time_threshold_minutes}")
-        logger.debug(f"database_path: {self.database_path}")
-        logger.debug(f"captcha_enabled: {self.captcha_enabled}")
-        logger.debug(f"captcha_timeout_seconds: {self.captcha_timeout_seconds}")
-        logger.debug(f"telegram_bot_token: {'***' + self.telegram_bot_token[-4:]}")  # Mask sensitive token
-
-
-@lru_cache
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "group_id=%s warning_topic_id=%s restrict_failed_users=%s "
+                "warning_threshold=%s warning_time_threshold_minutes=%s "
+                "database_path=%s captcha_enabled=%s captcha_timeout_seconds=%s "
+                "webhook_url=%s webhook_port=%s "
+                "telegram_bot_token=***%s",  # Mask sensitive token
+                self.group_id,
+                self.warning_topic_id,
+                self.restrict_failed_users,
+                self.warning_threshold,
+                self.warning_time_threshold_minutes,
+                self.database_path,
+                self.captcha_enabled,
+                self.captcha_timeout_seconds,
+                self.webhook_url,
+                self.webhook_port,
+                self.telegram_bot_token[-4:],
+            )
+
+
+# Module-level singleton for application settings
+_settings: Settings | None = None
+
+
 def get_settings() -> Settings:
     """
-    Get cached application settings.
+    Get the application settings singleton.
 
-    Settings are loaded once and cached for subsequent calls.
-    Use lru_cache to avoid re-reading environment on every access.
+    Settings are loaded from the environment on first access and the same
+    instance is returned afterwards. A plain module global is used rather
+    than lru_cache so repeat calls skip the cache wrapper.
 
     Returns:
         Settings: Application configuration instance.
     """
-    return Settings()
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def reset_settings() -> None:
+    """
+    Reset settings singleton (for testing).
+
+    Clears the cached instance so the next get_settings() call reloads
+    configuration from the environment.
+    """
+    global _settings
+    _settings = None
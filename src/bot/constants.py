@@ -5,6 +5,8 @@ This module contains shared constants used across multiple bot modules,
 including permissions, message templates, and formatting utilities.
 """
 
+from functools import lru_cache
+
 from telegram import ChatPermissions
 
 # Permissions applied when restricting a user (effectively mutes them)
@@ -29,11 +31,13 @@ RESTRICTED_PERMISSIONS = ChatPermissions(
 MISSING_ITEMS_SEPARATOR = " dan "
 
 
+@lru_cache(maxsize=64)
 def format_threshold_display(threshold_minutes: int) -> str:
     """
     Format time threshold in minutes to human-readable Indonesian text.
     
     Converts minutes to "X jam" for values >= 60, or "Y menit" for smaller values.
+    Results are cached since only a handful of configured thresholds are used.
     
     Args:
         threshold_minutes: Time threshold in minutes.
@@ -53,7 +57,7 @@ WARNING_MESSAGE_NO_RESTRICTION = (
     "⚠️ Hai {user_mention}, mohon lengkapi {missing_text} kamu "
     "untuk mematuhi aturan grup.\n"
     "Kamu akan dibatasi setelah {threshold_display}.\n\n"
-    "📖 [Baca aturan grup]({rules_link})"
+    '📖 <a href="{rules_link}">Baca aturan grup</a>'
 )
 
 # Progressive restriction mode: First message warning
@@ -61,23 +65,23 @@ WARNING_MESSAGE_WITH_THRESHOLD = (
     "⚠️ Hai {user_mention}, mohon lengkapi {missing_text} kamu "
     "untuk mematuhi aturan grup.\n"
     "Kamu akan dibatasi setelah {warning_threshold} pesan atau {threshold_display}.\n\n"
-    "📖 [Baca aturan grup]({rules_link})"
+    '📖 <a href="{rules_link}">Baca aturan grup</a>'
 )
 
 # Restriction message when user reaches message threshold
 RESTRICTION_MESSAGE_AFTER_MESSAGES = (
     "🚫 {user_mention} telah dibatasi setelah {message_count} pesan.\n"
     "Mohon lengkapi {missing_text} kamu untuk mematuhi aturan grup.\n\n"
-    "📖 [Baca aturan grup]({rules_link})\n"
-    "✉️ [Hubungi langsung robot untuk membuka pembatasan (mohon pertimbangkan bahwa percakapan dengan robot saat ini sebagian besar belum direkam)]({dm_link})"
+    '📖 <a href="{rules_link}">Baca aturan grup</a>\n'
+    '✉️ <a href="{dm_link}">Hubungi langsung robot untuk membuka pembatasan (mohon pertimbangkan bahwa percakapan dengan robot saat ini sebagian besar belum direkam)</a>'
 )
 
 # Restriction message when user reaches time threshold (scheduler)
 RESTRICTION_MESSAGE_AFTER_TIME = (
     "🚫 {user_mention} telah dibatasi karena tidak melengkapi profil "
     "dalam {threshold_display}.\n\n"
-    "📖 [Baca aturan grup]({rules_link})\n"
-    "✉️ [Hubungi langsung robot untuk membuka pembatasan (mohon pertimbangkan bahwa percakapan dengan robot saat ini sebagian besar belum direkam)]({dm_link})"
+    '📖 <a href="{rules_link}">Baca aturan grup</a>\n'
+    '✉️ <a href="{dm_link}">Hubungi langsung robot untuk membuka pembatasan (mohon pertimbangkan bahwa percakapan dengan robot saat ini sebagian besar belum direkam)</a>'
 )
 
 # Captcha verification message templates
@@ -113,7 +117,7 @@ DM_INCOMPLETE_PROFILE_MESSAGE = (
     "❌ Kamu belum memenuhi persyaratan.\n\n"
     "Mohon lengkapi {missing_text} kamu terlebih dahulu, "
     "lalu kirim pesan lagi ke bot ini.\n\n"
-    "📖 [Baca aturan grup]({rules_link})"
+    '📖 <a href="{rules_link}">Baca aturan grup</a>'
 )
 
 DM_NO_RESTRICTION_MESSAGE = (
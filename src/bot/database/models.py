@@ -8,10 +8,34 @@ enforcement system.
 
 from datetime import UTC, datetime
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import DateTime, Index, UniqueConstraint, text
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import Field, SQLModel
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    DateTime column that always holds UTC.
+
+    SQLite has no timezone support, so values are stored as naive UTC (the
+    same format as a plain DateTime column) and come back timezone-aware.
+    Callers can compare loaded timestamps with datetime.now(UTC) directly.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            value = value.replace(tzinfo=UTC)
+        return value
+
+
 class UserWarning(SQLModel, table=True):
     """
     Tracks warning state for users with incomplete profiles.
@@ -23,7 +47,7 @@ class UserWarning(SQLModel, table=True):
 
     Attributes:
         id: Primary key (auto-generated).
-        user_id: Telegram user ID (indexed for fast lookups).
+        user_id: Telegram user ID.
         group_id: Telegram group ID where the warning occurred.
         message_count: Number of messages sent since first warning.
         first_warned_at: Timestamp of first warning.
@@ -35,13 +59,36 @@ class UserWarning(SQLModel, table=True):
     """
 
     __tablename__ = "user_warnings"
+    __table_args__ = (
+        # Covers the (user, group, restriction state) lookups done per message
+        Index("ix_uw_user_group_restricted", "user_id", "group_id", "is_restricted"),
+        # At most one active warning per user and group; also the conflict
+        # target for the get-or-create upsert
+        Index(
+            "ux_uw_active_user_group",
+            "user_id",
+            "group_id",
+            unique=True,
+            sqlite_where=text("is_restricted = 0"),
+        ),
+        # Only active warnings are scanned by the time-threshold job
+        Index(
+            "ix_uw_active_first_warned",
+            "first_warned_at",
+            sqlite_where=text("is_restricted = 0"),
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    user_id: int = Field(index=True)
-    group_id: int = Field(index=True)
+    user_id: int
+    group_id: int
     message_count: int = Field(default=1)
-    first_warned_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    last_message_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    first_warned_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=UTCDateTime
+    )
+    last_message_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=UTCDateTime
+    )
     is_restricted: bool = Field(default=False)
     restricted_by_bot: bool = Field(default=False)
 
@@ -68,7 +115,9 @@ class PhotoVerificationWhitelist(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(index=True, unique=True)
     verified_by_admin_id: int
-    verified_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    verified_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=UTCDateTime
+    )
     notes: str | None = Field(default=None)
 
 
@@ -101,4 +150,6 @@ class PendingCaptchaValidation(SQLModel, table=True):
     chat_id: int = Field(index=True)
     message_id: int
     user_full_name: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), sa_type=UTCDateTime
+    )
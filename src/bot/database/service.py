@@ -7,9 +7,14 @@ with SQLite backend for persistence.
 """
 
 import logging
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Any
 
+from sqlalchemy import bindparam, event, exists, func, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine, delete, select
 
 from bot.database.models import (
@@ -20,6 +25,77 @@ from bot.database.models import (
 
 logger = logging.getLogger(__name__)
 
+# Connection-level SQLite tuning applied to every new DBAPI connection.
+# WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+# avoids an fsync on every commit. busy_timeout makes a connection wait for
+# a lock held by another process (e.g. a sqlite3 shell) instead of failing
+# immediately with "database is locked".
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+# Bump whenever tables or indexes change so existing databases are migrated
+SCHEMA_VERSION = 1
+
+# Statements for the per-message lookups, built once at import and executed
+# with bound parameters so the hot path skips query construction
+_IS_RESTRICTED_BY_BOT = select(
+    exists().where(
+        UserWarning.user_id == bindparam("uid"),
+        UserWarning.group_id == bindparam("gid"),
+        UserWarning.is_restricted,
+        UserWarning.restricted_by_bot,
+    )
+)
+_CLEAR_RESTRICTED_BY_BOT = (
+    update(UserWarning)
+    .where(
+        UserWarning.user_id == bindparam("uid"),
+        UserWarning.group_id == bindparam("gid"),
+        UserWarning.is_restricted,
+        UserWarning.restricted_by_bot,
+    )
+    .values(restricted_by_bot=False)
+)
+_DELETE_USER_WARNINGS = delete(UserWarning).where(
+    UserWarning.user_id == bindparam("uid"),
+    UserWarning.group_id == bindparam("gid"),
+)
+_GET_WHITELISTED_USER_IDS = select(PhotoVerificationWhitelist.user_id)
+_GET_PENDING_CAPTCHA = select(PendingCaptchaValidation).where(
+    PendingCaptchaValidation.user_id == bindparam("uid"),
+    PendingCaptchaValidation.group_id == bindparam("gid"),
+)
+_POP_PENDING_CAPTCHA = (
+    delete(PendingCaptchaValidation)
+    .where(
+        PendingCaptchaValidation.user_id == bindparam("uid"),
+        PendingCaptchaValidation.group_id == bindparam("gid"),
+    )
+    .returning(PendingCaptchaValidation)
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Apply SQLITE_PRAGMAS to a freshly opened SQLite connection.
+
+    Registered as a SQLAlchemy "connect" event listener on the engine.
+
+    Args:
+        dbapi_connection: Raw sqlite3 connection.
+        connection_record: SQLAlchemy pool record (unused).
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 
 class DatabaseService:
     """
@@ -40,84 +116,177 @@ class DatabaseService:
         path = Path(database_path)
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        self._engine = create_engine(f"sqlite:///{database_path}")
+        # The bot runs in a single process on one event loop, so a single
+        # shared connection is enough and keeps the PRAGMAs in effect
+        self._engine = create_engine(
+            f"sqlite:///{database_path}",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        event.listen(self._engine, "connect", _apply_sqlite_pragmas)
+        self._ensure_schema()
+
+        # Returned records are used after the session closes, so don't expire
+        # them on commit (avoids a refresh SELECT after every write)
+        self._session_factory = sessionmaker(
+            self._engine, class_=Session, expire_on_commit=False
+        )
+
+        # Whitelisted user IDs, loaded on first lookup and kept in sync by
+        # the add/remove methods (this process is the only writer)
+        self._whitelisted_user_ids: set[int] | None = None
+
+    def _ensure_schema(self) -> None:
+        """
+        Create tables and indexes unless the database is already up to date.
+
+        The schema version is stored in SQLite's user_version header, so a
+        restart against an existing database skips create_all() and the
+        index checks, which each need a round trip per table.
+        """
+        with self._engine.connect() as connection:
+            version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+        if version >= SCHEMA_VERSION:
+            return
+
         SQLModel.metadata.create_all(self._engine)
+        self._create_missing_indexes()
 
-    def get_or_create_user_warning(self, user_id: int, group_id: int) -> UserWarning:
+        with self._engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _create_missing_indexes(self) -> None:
         """
-        Get existing warning record or create a new one.
+        Create indexes declared on the models but missing from the database.
 
-        Looks for an active (non-restricted) warning record for the user.
-        If none exists, creates a new record with message_count=1.
+        create_all() skips tables that already exist, so indexes added to
+        a model after its table was created have to be migrated separately.
+        Duplicate active warnings are removed first, since they would make
+        creating the unique index on active warnings fail.
+        """
+        self._delete_duplicate_active_warnings()
+
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self._engine, checkfirst=True)
+
+    def _delete_duplicate_active_warnings(self) -> None:
+        """
+        Keep only the newest active warning per user and group.
+
+        Databases created before ux_uw_active_user_group existed may hold
+        several active warnings for the same user and group.
+        """
+        newest_ids = (
+            select(func.max(UserWarning.id))
+            .where(~UserWarning.is_restricted)
+            .group_by(UserWarning.user_id, UserWarning.group_id)
+        )
+        statement = delete(UserWarning).where(
+            ~UserWarning.is_restricted,
+            UserWarning.id.not_in(newest_ids),
+        )
+
+        with self._engine.begin() as connection:
+            deleted = connection.execute(statement).rowcount
+
+        if deleted:
+            logger.warning("Removed %s duplicate active warning records", deleted)
+
+    def _upsert_active_warning(
+        self, user_id: int, group_id: int, now: datetime, set_: dict[str, Any]
+    ) -> UserWarning:
+        """
+        Insert an active warning record, or update the existing one.
+
+        Runs a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING against
+        the unique index on active warnings (ux_uw_active_user_group), so
+        every upsert uses the same conflict target.
 
         Args:
             user_id: Telegram user ID.
             group_id: Telegram group ID.
+            now: Timestamp for a newly created record.
+            set_: Columns to update when an active record already exists.
 
         Returns:
             UserWarning: Active warning record for the user.
         """
-        with Session(self._engine) as session:
-            # Look for active (non-restricted) warning record
-            statement = select(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-                ~UserWarning.is_restricted,
-            )
-            record = session.exec(statement).first()
-
-            if record:
-                return record
-
-            # Create new warning record
-            new_record = UserWarning(
+        statement = (
+            insert(UserWarning)
+            .values(
                 user_id=user_id,
                 group_id=group_id,
                 message_count=1,
-                first_warned_at=datetime.now(UTC),
-                last_message_at=datetime.now(UTC),
+                first_warned_at=now,
+                last_message_at=now,
+                is_restricted=False,
+                restricted_by_bot=False,
             )
-            session.add(new_record)
+            .on_conflict_do_update(
+                index_elements=["user_id", "group_id"],
+                index_where=text("is_restricted = 0"),
+                set_=set_,
+            )
+            .returning(UserWarning)
+        )
+
+        with self._session_factory() as session:
+            record = session.scalars(statement).one()
             session.commit()
-            session.refresh(new_record)
-            return new_record
+            return record
 
-    def increment_message_count(self, user_id: int, group_id: int) -> UserWarning:
+    def get_or_create_user_warning(self, user_id: int, group_id: int) -> UserWarning:
         """
-        Increment message count for an existing warning record.
+        Get existing warning record or create a new one.
 
-        Called when user sends additional messages after first warning
-        but before reaching the restriction threshold.
+        Looks for an active (non-restricted) warning record for the user.
+        If none exists, creates a new record with message_count=1. Both cases
+        are handled by a single upsert against the unique index on active
+        warnings.
 
         Args:
             user_id: Telegram user ID.
             group_id: Telegram group ID.
 
         Returns:
-            UserWarning: Updated warning record.
-
-        Raises:
-            ValueError: If no active warning record exists.
+            UserWarning: Active warning record for the user.
         """
-        with Session(self._engine) as session:
-            statement = select(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-                ~UserWarning.is_restricted,
-            )
-            record = session.exec(statement).first()
+        # No-op update so the existing row is returned on conflict
+        return self._upsert_active_warning(
+            user_id,
+            group_id,
+            datetime.now(UTC),
+            {"user_id": UserWarning.user_id},
+        )
+
+    def record_user_message(self, user_id: int, group_id: int) -> UserWarning:
+        """
+        Count a message from a user with an incomplete profile.
 
-            if record:
-                record.message_count += 1
-                record.last_message_at = datetime.now(UTC)
-                session.add(record)
-                session.commit()
-                session.refresh(record)
-                return record
+        Creates an active warning record with message_count=1 for the first
+        message, or increments the count of the existing active record, in a
+        single upsert. The returned message_count therefore includes the
+        message being recorded.
 
-            raise ValueError(
-                f"No warning record found for user {user_id} in group {group_id}"
-            )
+        Args:
+            user_id: Telegram user ID.
+            group_id: Telegram group ID.
+
+        Returns:
+            UserWarning: Active warning record after counting the message.
+        """
+        now = datetime.now(UTC)
+        return self._upsert_active_warning(
+            user_id,
+            group_id,
+            now,
+            {
+                "message_count": UserWarning.message_count + 1,
+                "last_message_at": now,
+            },
+        )
 
     def mark_user_restricted(self, user_id: int, group_id: int) -> UserWarning:
         """
@@ -136,7 +305,7 @@ class DatabaseService:
         Raises:
             ValueError: If no active warning record exists.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = select(UserWarning).where(
                 UserWarning.user_id == user_id,
                 UserWarning.group_id == group_id,
@@ -150,13 +319,53 @@ class DatabaseService:
                 record.last_message_at = datetime.now(UTC)
                 session.add(record)
                 session.commit()
-                session.refresh(record)
                 return record
 
             raise ValueError(
                 f"No warning record found for user {user_id} in group {group_id}"
             )
 
+    def mark_users_restricted(
+        self, user_ids: list[int], group_id: int
+    ) -> list[UserWarning]:
+        """
+        Mark several users as restricted in a single statement.
+
+        Batch counterpart of mark_user_restricted() used by the scheduler,
+        issuing one UPDATE ... RETURNING for the whole batch instead of one
+        transaction per user. Users without an active warning record are
+        skipped.
+
+        Args:
+            user_ids: Telegram user IDs to mark as restricted.
+            group_id: Telegram group ID.
+
+        Returns:
+            list[UserWarning]: Updated warning records.
+        """
+        if not user_ids:
+            return []
+
+        statement = (
+            update(UserWarning)
+            .where(
+                UserWarning.user_id.in_(user_ids),
+                UserWarning.group_id == group_id,
+                ~UserWarning.is_restricted,
+            )
+            .values(
+                is_restricted=True,
+                restricted_by_bot=True,
+                last_message_at=datetime.now(UTC),
+            )
+            .returning(UserWarning)
+        )
+
+        with self._session_factory() as session:
+            records = list(session.scalars(statement).all())
+            session.commit()
+            return records
+
     def is_user_restricted_by_bot(self, user_id: int, group_id: int) -> bool:
         """
         Check if user was restricted by this bot.
@@ -172,15 +381,10 @@ class DatabaseService:
         Returns:
             bool: True if user was restricted by this bot.
         """
-        with Session(self._engine) as session:
-            statement = select(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-                UserWarning.is_restricted,
-                UserWarning.restricted_by_bot,
-            )
-            record = session.exec(statement).first()
-            return record is not None
+        params = {"uid": user_id, "gid": group_id}
+
+        with self._session_factory() as session:
+            return bool(session.scalar(_IS_RESTRICTED_BY_BOT, params))
 
     def mark_user_unrestricted(self, user_id: int, group_id: int) -> None:
         """
@@ -193,26 +397,19 @@ class DatabaseService:
             user_id: Telegram user ID.
             group_id: Telegram group ID.
         """
-        with Session(self._engine) as session:
-            statement = select(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-                UserWarning.is_restricted,
-                UserWarning.restricted_by_bot,
-            )
-            record = session.exec(statement).first()
+        params = {"uid": user_id, "gid": group_id}
 
-            if record:
-                record.restricted_by_bot = False
-                session.add(record)
-                session.commit()
+        with self._session_factory() as session:
+            session.execute(_CLEAR_RESTRICTED_BY_BOT, params)
+            session.commit()
 
     def delete_user_warnings(self, user_id: int, group_id: int) -> int:
         """
         Delete all warning records for a user in a specific group.
 
         This completely removes warning history for the user, allowing them
-        to start fresh. Used when admins manually verify/whitelist users.
+        to start fresh. Used when admins manually verify/whitelist users and
+        when the scheduler finds a warned user has been kicked.
 
         Args:
             user_id: Telegram user ID.
@@ -221,22 +418,39 @@ class DatabaseService:
         Returns:
             int: Number of warning records deleted.
         """
-        with Session(self._engine) as session:
-            # First count records to be deleted
-            count_statement = select(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-            )
-            count = len(session.exec(count_statement).all())
+        params = {"uid": user_id, "gid": group_id}
 
-            # Bulk delete using SQLModel delete statement
-            delete_statement = delete(UserWarning).where(
-                UserWarning.user_id == user_id,
-                UserWarning.group_id == group_id,
-            )
-            session.exec(delete_statement)
+        with self._session_factory() as session:
+            result = session.execute(_DELETE_USER_WARNINGS, params)
+            session.commit()
+            return result.rowcount
+
+    def delete_users_warnings(self, user_ids: list[int], group_id: int) -> int:
+        """
+        Delete warning records for several users in a single statement.
+
+        Batch counterpart of delete_user_warnings() used by the scheduler
+        to drop warnings of kicked users in one transaction.
+
+        Args:
+            user_ids: Telegram user IDs whose warnings should be deleted.
+            group_id: Telegram group ID.
+
+        Returns:
+            int: Number of warning records deleted.
+        """
+        if not user_ids:
+            return 0
+
+        statement = delete(UserWarning).where(
+            UserWarning.user_id.in_(user_ids),
+            UserWarning.group_id == group_id,
+        )
+
+        with self._session_factory() as session:
+            result = session.execute(statement)
             session.commit()
-            return count
+            return result.rowcount
 
     def add_photo_verification_whitelist(
         self, user_id: int, verified_by_admin_id: int, notes: str | None = None
@@ -255,7 +469,7 @@ class DatabaseService:
         Raises:
             ValueError: If user is already whitelisted.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = select(PhotoVerificationWhitelist).where(
                 PhotoVerificationWhitelist.user_id == user_id
             )
@@ -271,25 +485,72 @@ class DatabaseService:
             )
             session.add(record)
             session.commit()
-            session.refresh(record)
-            return record
 
-    def is_user_photo_whitelisted(self, user_id: int) -> bool:
+        if self._whitelisted_user_ids is not None:
+            self._whitelisted_user_ids.add(user_id)
+        return record
+
+    def verify_user(
+        self, user_id: int, verified_by_admin_id: int, group_id: int
+    ) -> int:
         """
-        Check if user is in photo verification whitelist.
+        Whitelist a user and delete their warnings in one transaction.
+
+        Combines add_photo_verification_whitelist and delete_user_warnings
+        for the /verify command, so both writes share a single commit.
 
         Args:
             user_id: Telegram user ID.
+            verified_by_admin_id: Telegram user ID of admin performing verification.
+            group_id: Telegram group ID whose warnings are deleted.
 
         Returns:
-            bool: True if user is whitelisted.
+            int: Number of warning records deleted.
+
+        Raises:
+            ValueError: If user is already whitelisted (nothing is changed).
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = select(PhotoVerificationWhitelist).where(
                 PhotoVerificationWhitelist.user_id == user_id
             )
-            record = session.exec(statement).first()
-            return record is not None
+            if session.exec(statement).first():
+                raise ValueError(f"User {user_id} is already whitelisted")
+
+            session.add(
+                PhotoVerificationWhitelist(
+                    user_id=user_id,
+                    verified_by_admin_id=verified_by_admin_id,
+                )
+            )
+            result = session.execute(
+                _DELETE_USER_WARNINGS, {"uid": user_id, "gid": group_id}
+            )
+            session.commit()
+
+        if self._whitelisted_user_ids is not None:
+            self._whitelisted_user_ids.add(user_id)
+        return result.rowcount
+
+    def is_user_photo_whitelisted(self, user_id: int) -> bool:
+        """
+        Check if user is in photo verification whitelist.
+
+        The whitelist is read from the database once and then answered from
+        memory, since this runs for every message from an uncached user.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            bool: True if user is whitelisted.
+        """
+        if self._whitelisted_user_ids is None:
+            with self._session_factory() as session:
+                self._whitelisted_user_ids = set(
+                    session.scalars(_GET_WHITELISTED_USER_IDS)
+                )
+        return user_id in self._whitelisted_user_ids
 
     def remove_photo_verification_whitelist(self, user_id: int) -> None:
         """
@@ -301,7 +562,7 @@ class DatabaseService:
         Raises:
             ValueError: If user is not in whitelist.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = select(PhotoVerificationWhitelist).where(
                 PhotoVerificationWhitelist.user_id == user_id
             )
@@ -313,6 +574,9 @@ class DatabaseService:
             session.delete(record)
             session.commit()
 
+        if self._whitelisted_user_ids is not None:
+            self._whitelisted_user_ids.discard(user_id)
+
     def get_warnings_past_time_threshold(
         self, minutes_threshold: int
     ) -> list[UserWarning]:
@@ -328,17 +592,16 @@ class DatabaseService:
         Returns:
             list[UserWarning]: List of warning records that should be auto-restricted.
         """
-        from datetime import timedelta
+        cutoff_time = datetime.now(UTC) - timedelta(minutes=minutes_threshold)
+        statement = select(UserWarning).where(
+            ~UserWarning.is_restricted,
+            UserWarning.first_warned_at <= cutoff_time,
+        )
 
-        with Session(self._engine) as session:
-            cutoff_time = datetime.now(UTC) - timedelta(minutes=minutes_threshold)
-            statement = select(UserWarning).where(
-                ~UserWarning.is_restricted,
-                UserWarning.first_warned_at <= cutoff_time,
-            )
-            records = session.exec(statement).all()
-            # Detach from session before returning
-            return [record for record in records]
+        # Rows stay loaded after the session closes (expire_on_commit=False),
+        # so the result list can be returned as is
+        with self._session_factory() as session:
+            return session.exec(statement).all()
 
     def add_pending_captcha(
         self,
@@ -361,7 +624,7 @@ class DatabaseService:
         Returns:
             PendingCaptchaValidation: Created pending validation record.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             record = PendingCaptchaValidation(
                 user_id=user_id,
                 group_id=group_id,
@@ -371,7 +634,6 @@ class DatabaseService:
             )
             session.add(record)
             session.commit()
-            session.refresh(record)
             return record
 
     def get_pending_captcha(
@@ -387,12 +649,10 @@ class DatabaseService:
         Returns:
             PendingCaptchaValidation | None: Pending validation record or None.
         """
-        with Session(self._engine) as session:
-            statement = select(PendingCaptchaValidation).where(
-                PendingCaptchaValidation.user_id == user_id,
-                PendingCaptchaValidation.group_id == group_id,
-            )
-            return session.exec(statement).first()
+        params = {"uid": user_id, "gid": group_id}
+
+        with self._session_factory() as session:
+            return session.scalars(_GET_PENDING_CAPTCHA, params).first()
 
     def remove_pending_captcha(self, user_id: int, group_id: int) -> bool:
         """
@@ -405,7 +665,7 @@ class DatabaseService:
         Returns:
             bool: True if a record was deleted, False if no record existed.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = delete(PendingCaptchaValidation).where(
                 PendingCaptchaValidation.user_id == user_id,
                 PendingCaptchaValidation.group_id == group_id,
@@ -414,6 +674,30 @@ class DatabaseService:
             session.commit()
             return result.rowcount > 0
 
+    def pop_pending_captcha(
+        self, user_id: int, group_id: int
+    ) -> PendingCaptchaValidation | None:
+        """
+        Remove and return pending captcha validation for a user.
+
+        Uses a single DELETE ... RETURNING, so checking for and removing the
+        record is one atomic statement.
+
+        Args:
+            user_id: Telegram user ID.
+            group_id: Telegram group ID.
+
+        Returns:
+            PendingCaptchaValidation | None: Removed record, or None if no
+                record existed.
+        """
+        params = {"uid": user_id, "gid": group_id}
+
+        with self._session_factory() as session:
+            record = session.scalars(_POP_PENDING_CAPTCHA, params).first()
+            session.commit()
+            return record
+
     def get_all_pending_captchas(self) -> list[PendingCaptchaValidation]:
         """
         Get all pending captcha validations.
@@ -423,9 +707,9 @@ class DatabaseService:
         Returns:
             list[PendingCaptchaValidation]: All pending validation records.
         """
-        with Session(self._engine) as session:
+        with self._session_factory() as session:
             statement = select(PendingCaptchaValidation)
-            return list(session.exec(statement).all())
+            return session.exec(statement).all()
 
 
 # Module-level singleton for database service
@@ -6,11 +6,14 @@ joins the group, they are restricted and presented with a captcha button.
 If they don't verify within the timeout period, they remain restricted.
 """
 
+import asyncio
 import logging
+from dataclasses import dataclass
 
 from sqlalchemy.exc import IntegrityError
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, User
 from telegram.constants import ChatMemberStatus
+from telegram.error import TelegramError
 from telegram.ext import (
     CallbackQueryHandler,
     ChatMemberHandler,
@@ -29,9 +32,33 @@ from bot.constants import (
 )
 from bot.database.service import get_database
 from bot.services.telegram_utils import get_user_mention, unrestrict_user
+from bot.services.user_locks import get_user_lock
 
 logger = logging.getLogger(__name__)
 
+# Prefix of the captcha button's callback_data, followed by the target user ID
+CAPTCHA_CALLBACK_PREFIX = "captcha_verify_"
+
+
+@dataclass(slots=True, frozen=True)
+class CaptchaJobData:
+    """
+    Payload passed to captcha timeout jobs.
+
+    Attributes:
+        user_id: Telegram user ID being challenged.
+        group_id: Telegram group ID.
+        chat_id: Chat ID where the challenge message was sent.
+        message_id: ID of the challenge message.
+        user_full_name: User's full name for the timeout message.
+    """
+
+    user_id: int
+    group_id: int
+    chat_id: int
+    message_id: int
+    user_full_name: str
+
 
 def get_captcha_job_name(group_id: int, user_id: int) -> str:
     """
@@ -54,9 +81,42 @@ async def _initiate_captcha_challenge(
     settings: Settings,
 ) -> None:
     """
-    Initiate captcha challenge for a new member.
+    Initiate captcha challenge for a new member, at most once per join.
+
+    One join usually produces both a chat_member update and a join message,
+    which are handled concurrently. The pending-captcha check and the
+    challenge run under the user's lock, so whichever update comes second
+    sees the pending record and skips.
+
+    Args:
+        context: Bot context with helper methods and job queue.
+        user: The user to challenge.
+        chat_id: The group chat ID.
+        settings: Bot settings.
+    """
+    async with get_user_lock(settings.group_id, user.id):
+        if get_database().get_pending_captcha(user.id, settings.group_id):
+            logger.info(
+                "Captcha already pending for user %s, skipping duplicate",
+                user.id,
+            )
+            return
+
+        await _send_captcha_challenge(context, user, chat_id, settings)
+
+
+async def _send_captcha_challenge(
+    context: ContextTypes.DEFAULT_TYPE,
+    user: User,
+    chat_id: int,
+    settings: Settings,
+) -> None:
+    """
+    Send a captcha challenge to a new member.
 
-    Sends captcha message with keyboard, stores in database, and schedules timeout job.
+    Restricts the user and sends the captcha message with keyboard concurrently,
+    then stores it in database and schedules timeout job. If the restriction
+    fails, the captcha message is deleted again.
 
     Args:
         context: Bot context with helper methods and job queue.
@@ -67,21 +127,10 @@ async def _initiate_captcha_challenge(
     user_id = user.id
     user_mention = get_user_mention(user)
 
-    try:
-        await context.bot.restrict_chat_member(
-            chat_id=chat_id,
-            user_id=user_id,
-            permissions=RESTRICTED_PERMISSIONS,
-        )
-        logger.info(f"Restricted new member {user_id} ({user.full_name}) for captcha")
-    except Exception as e:
-        logger.error(f"Failed to restrict new member {user_id}: {e}")
-        return
-
     keyboard = InlineKeyboardMarkup([
         [InlineKeyboardButton(
             "✅ Saya bukan robot",
-            callback_data=f"captcha_verify_{user_id}",
+            callback_data=f"{CAPTCHA_CALLBACK_PREFIX}{user_id}",
         )]
     ])
 
@@ -90,14 +139,46 @@ async def _initiate_captcha_challenge(
         timeout=settings.captcha_timeout_seconds,
     )
 
-    sent_message = await context.bot.send_message(
-        chat_id=chat_id,
-        message_thread_id=settings.warning_topic_id,
-        text=welcome_message,
-        parse_mode="Markdown",
-        reply_markup=keyboard,
+    # Restriction and challenge message don't depend on each other, so send
+    # both requests at once instead of waiting for two round trips
+    restrict_result, sent_message = await asyncio.gather(
+        context.bot.restrict_chat_member(
+            chat_id=chat_id,
+            user_id=user_id,
+            permissions=RESTRICTED_PERMISSIONS,
+        ),
+        context.bot.send_message(
+            chat_id=chat_id,
+            message_thread_id=settings.warning_topic_id,
+            text=welcome_message,
+            parse_mode="HTML",
+            reply_markup=keyboard,
+        ),
+        return_exceptions=True,
     )
 
+    if isinstance(restrict_result, Exception):
+        logger.error("Failed to restrict new member %s: %s", user_id, restrict_result)
+        # Don't leave a challenge behind for a user we couldn't restrict
+        if not isinstance(sent_message, Exception):
+            try:
+                await context.bot.delete_message(
+                    chat_id=sent_message.chat_id,
+                    message_id=sent_message.message_id,
+                )
+            except Exception as e:
+                logger.error(
+                    "Failed to delete captcha message for user %s: %s",
+                    user_id,
+                    e,
+                )
+        return
+
+    logger.info("Restricted new member %s (%s) for captcha", user_id, user.full_name)
+
+    if isinstance(sent_message, Exception):
+        raise sent_message
+
     db = get_database()
     try:
         db.add_pending_captcha(
@@ -108,7 +189,22 @@ async def _initiate_captcha_challenge(
             user_full_name=user.full_name,
         )
     except IntegrityError:
-        logger.info(f"Captcha already exists for user {user_id} (race condition handled)")
+        logger.info(
+            "Captcha already exists for user %s (race condition handled)",
+            user_id,
+        )
+        # The existing record has its own challenge message; drop the duplicate
+        try:
+            await context.bot.delete_message(
+                chat_id=sent_message.chat_id,
+                message_id=sent_message.message_id,
+            )
+        except TelegramError as e:
+            logger.error(
+                "Failed to delete duplicate captcha message for user %s: %s",
+                user_id,
+                e,
+            )
         return
 
     job_name = get_captcha_job_name(settings.group_id, user_id)
@@ -116,18 +212,20 @@ async def _initiate_captcha_challenge(
         captcha_timeout_callback,
         when=settings.captcha_timeout_seconds,
         name=job_name,
-        data={
-            "user_id": user_id,
-            "group_id": settings.group_id,
-            "chat_id": sent_message.chat_id,
-            "message_id": sent_message.message_id,
-            "user_full_name": user.full_name,
-        },
+        data=CaptchaJobData(
+            user_id=user_id,
+            group_id=settings.group_id,
+            chat_id=sent_message.chat_id,
+            message_id=sent_message.message_id,
+            user_full_name=user.full_name,
+        ),
     )
 
     logger.info(
-        f"Sent captcha challenge to user {user_id} ({user.full_name}), "
-        f"timeout in {settings.captcha_timeout_seconds}s"
+        "Sent captcha challenge to user %s (%s), timeout in %ss",
+        user_id,
+        user.full_name,
+        settings.captcha_timeout_seconds,
     )
 
 
@@ -156,23 +254,40 @@ async def new_member_handler(
         return
 
     if update.effective_chat and update.effective_chat.id != settings.group_id:
-        logger.debug(f"Message from wrong chat {update.effective_chat.id}, expected {settings.group_id}, skipping")
+        logger.debug(
+            "Message from wrong chat %s, expected %s, skipping",
+            update.effective_chat.id,
+            settings.group_id,
+        )
         return
     
-    logger.info(f"Processing new members: {len(update.message.new_chat_members)} member(s)")
-
-    for new_member in update.message.new_chat_members:
-        if new_member.is_bot:
-            continue
-
-        user_id = new_member.id
+    logger.info(
+        "Processing new members: %s member(s)",
+        len(update.message.new_chat_members),
+    )
 
-        db = get_database()
-        if db.get_pending_captcha(user_id, settings.group_id):
-            logger.info(f"Captcha already pending for user {user_id}, skipping duplicate (new_member_handler)")
-            continue
+    group_id = settings.group_id
+    members_to_challenge = [
+        member for member in update.message.new_chat_members if not member.is_bot
+    ]
 
-        await _initiate_captcha_challenge(context, new_member, settings.group_id, settings)
+    # Challenge all members concurrently so a bulk join costs one round of
+    # API calls instead of one per member; a failure for one member must
+    # not prevent the others from being challenged
+    results = await asyncio.gather(
+        *(
+            _initiate_captcha_challenge(context, member, group_id, settings)
+            for member in members_to_challenge
+        ),
+        return_exceptions=True,
+    )
+    for member, result in zip(members_to_challenge, results):
+        if isinstance(result, Exception):
+            logger.error(
+                "Failed to send captcha challenge to user %s: %s",
+                member.id,
+                result,
+            )
 
 
 async def chat_member_handler(
@@ -200,7 +315,11 @@ async def chat_member_handler(
         return
 
     if update.effective_chat and update.effective_chat.id != settings.group_id:
-        logger.debug(f"Update from wrong chat {update.effective_chat.id}, expected {settings.group_id}, skipping")
+        logger.debug(
+            "Update from wrong chat %s, expected %s, skipping",
+            update.effective_chat.id,
+            settings.group_id,
+        )
         return
 
     old_status = update.chat_member.old_chat_member.status
@@ -216,23 +335,20 @@ async def chat_member_handler(
     }
 
     if old_status not in left_statuses or new_status not in member_statuses:
-        logger.debug(f"Not a join event: {old_status} -> {new_status}, skipping")
+        logger.debug("Not a join event: %s -> %s, skipping", old_status, new_status)
         return
 
     new_member = update.chat_member.new_chat_member.user
 
     if new_member.is_bot:
-        logger.debug(f"New member {new_member.id} is a bot, skipping captcha")
+        logger.debug("New member %s is a bot, skipping captcha", new_member.id)
         return
 
-    logger.info(f"Detected new member via ChatMemberUpdated: {new_member.id} ({new_member.full_name})")
-
-    user_id = new_member.id
-
-    db = get_database()
-    if db.get_pending_captcha(user_id, settings.group_id):
-        logger.info(f"Captcha already pending for user {user_id}, skipping duplicate (chat_member_handler)")
-        return
+    logger.info(
+        "Detected new member via ChatMemberUpdated: %s (%s)",
+        new_member.id,
+        new_member.full_name,
+    )
 
     await _initiate_captcha_challenge(context, new_member, settings.group_id, settings)
 
@@ -257,7 +373,8 @@ async def captcha_callback_handler(
     await query.answer()
 
     callback_user_id = query.from_user.id
-    target_user_id = int(query.data.split("_")[-1])
+    # Pattern filter guarantees the data is the prefix followed by digits
+    target_user_id = int(query.data[len(CAPTCHA_CALLBACK_PREFIX):])
 
     if callback_user_id != target_user_id:
         await query.answer(CAPTCHA_WRONG_USER_MESSAGE, show_alert=True)
@@ -269,13 +386,13 @@ async def captcha_callback_handler(
     current_jobs = context.job_queue.get_jobs_by_name(job_name)
     for job in current_jobs:
         job.schedule_removal()
-        logger.debug(f"Cancelled timeout job for user {target_user_id}")
+        logger.debug("Cancelled timeout job for user %s", target_user_id)
 
     try:
         await unrestrict_user(context.bot, settings.group_id, target_user_id)
-        logger.info(f"Unrestricted verified user {target_user_id}")
+        logger.info("Unrestricted verified user %s", target_user_id)
     except Exception as e:
-        logger.error(f"Failed to unrestrict user {target_user_id}: {e}")
+        logger.error("Failed to unrestrict user %s: %s", target_user_id, e)
         await query.answer(CAPTCHA_FAILED_VERIFICATION_MESSAGE, show_alert=True)
         return  # Stop execution here so user can retry
 
@@ -287,12 +404,16 @@ async def captcha_callback_handler(
     try:
         await query.edit_message_text(
             text=CAPTCHA_VERIFIED_MESSAGE.format(user_mention=user_mention),
-            parse_mode="Markdown",
+            parse_mode="HTML",
         )
     except Exception as e:
-        logger.error(f"Failed to edit captcha message: {e}")
+        logger.error("Failed to edit captcha message: %s", e)
 
-    logger.info(f"User {target_user_id} ({query.from_user.full_name}) verified successfully")
+    logger.info(
+        "User %s (%s) verified successfully",
+        target_user_id,
+        query.from_user.full_name,
+    )
 
 
 async def captcha_timeout_callback(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -311,20 +432,15 @@ async def captcha_timeout_callback(context: ContextTypes.DEFAULT_TYPE) -> None:
     if not job or not job.data:
         return
 
-    data = job.data
-    user_id = data["user_id"]
-    group_id = data["group_id"]
-    chat_id = data["chat_id"]
-    message_id = data["message_id"]
-    user_full_name = data.get("user_full_name", f"User {user_id}")
+    data: CaptchaJobData = job.data
 
     await handle_captcha_expiration(
         bot=context.bot,
-        user_id=user_id,
-        group_id=group_id,
-        chat_id=chat_id,
-        message_id=message_id,
-        user_full_name=user_full_name,
+        user_id=data.user_id,
+        group_id=data.group_id,
+        chat_id=data.chat_id,
+        message_id=data.message_id,
+        user_full_name=data.user_full_name,
     )
 
 
@@ -349,6 +465,6 @@ def get_handlers() -> list:
         ),
         CallbackQueryHandler(
             captcha_callback_handler,
-            pattern=r"^captcha_verify_\d+$",
+            pattern=rf"^{CAPTCHA_CALLBACK_PREFIX}\d+$",
         ),
     ]
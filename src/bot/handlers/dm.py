@@ -4,7 +4,8 @@ DM (Direct Message) handler for the PythonID bot.
 This module handles private messages to the bot, primarily for the
 unrestriction flow. When a restricted user DMs the bot:
 1. Check if user is in the group
-2. Check if user has an active pending captcha (redirect to group)
+2. Check if user has an active pending captcha (redirect to group,
+   only when captcha is enabled)
 3. Check if user's profile is complete
 4. If profile-restricted by bot and profile complete, unrestrict them
 """
@@ -12,7 +13,7 @@ unrestriction flow. When a restricted user DMs the bot:
 import logging
 
 from telegram import Update
-from telegram.constants import ChatMemberStatus
+from telegram.constants import ChatMemberStatus, ChatType
 from telegram.ext import ContextTypes
 
 from bot.config import get_settings
@@ -51,7 +52,7 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     # Only handle private chats
-    if update.effective_chat and update.effective_chat.type != "private":
+    if update.effective_chat and update.effective_chat.type != ChatType.PRIVATE:
         return
 
     user = update.message.from_user
@@ -64,18 +65,24 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if user_status is None or user_status in (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED):
         await update.message.reply_text(DM_NOT_IN_GROUP_MESSAGE)
         logger.info(
-            f"DM from user {user.id} ({user.full_name}) - not in group {settings.group_id}"
+            "DM from user %s (%s) - not in group %s",
+            user.id,
+            user.full_name,
+            settings.group_id,
         )
         return
 
     db = get_database()
 
-    # Check if user has an active pending captcha
-    pending_captcha = db.get_pending_captcha(user.id, settings.group_id)
-    if pending_captcha:
+    # Check if user has an active pending captcha (only tracked while the
+    # captcha feature is enabled, so skip the lookup otherwise)
+    if settings.captcha_enabled and db.get_pending_captcha(user.id, settings.group_id):
         await update.message.reply_text(CAPTCHA_PENDING_DM_MESSAGE)
         logger.info(
-            f"DM from user {user.id} ({user.full_name}) - has pending captcha (group_id={settings.group_id})"
+            "DM from user %s (%s) - has pending captcha (group_id=%s)",
+            user.id,
+            user.full_name,
+            settings.group_id,
         )
         return
 
@@ -90,9 +97,12 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             missing_text=missing_text,
             rules_link=settings.rules_link,
         )
-        await update.message.reply_text(reply_message, parse_mode="Markdown")
+        await update.message.reply_text(reply_message, parse_mode="HTML")
         logger.info(
-            f"DM from user {user.id} ({user.full_name}) - missing: {missing_text}"
+            "DM from user %s (%s) - missing: %s",
+            user.id,
+            user.full_name,
+            missing_text,
         )
         return
 
@@ -100,7 +110,10 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not db.is_user_restricted_by_bot(user.id, settings.group_id):
         await update.message.reply_text(DM_NO_RESTRICTION_MESSAGE)
         logger.info(
-            f"DM from user {user.id} ({user.full_name}) - no bot restriction (group_id={settings.group_id})"
+            "DM from user %s (%s) - no bot restriction (group_id=%s)",
+            user.id,
+            user.full_name,
+            settings.group_id,
         )
         return
 
@@ -110,7 +123,10 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         db.mark_user_unrestricted(user.id, settings.group_id)
         await update.message.reply_text(DM_ALREADY_UNRESTRICTED_MESSAGE)
         logger.info(
-            f"User {user.id} ({user.full_name}) already unrestricted - clearing record (group_id={settings.group_id})"
+            "User %s (%s) already unrestricted - clearing record (group_id=%s)",
+            user.id,
+            user.full_name,
+            settings.group_id,
         )
         return
 
@@ -122,5 +138,8 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     await update.message.reply_text(DM_UNRESTRICTION_SUCCESS_MESSAGE)
     logger.info(
-        f"Unrestricted user {user.id} ({user.full_name}) via DM (group_id={settings.group_id})"
+        "Unrestricted user %s (%s) via DM (group_id=%s)",
+        user.id,
+        user.full_name,
+        settings.group_id,
     )
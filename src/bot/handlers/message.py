@@ -7,7 +7,9 @@ have complete profiles (photo + username). It implements two modes:
 2. Restriction mode: Progressive enforcement with muting after threshold
 """
 
+import asyncio
 import logging
+from functools import partial
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -26,6 +28,7 @@ from bot.database.service import get_database
 from bot.services.bot_info import BotInfoCache
 from bot.services.telegram_utils import get_user_mention
 from bot.services.user_checker import check_user_profile
+from bot.services.user_locks import get_user_lock
 
 logger = logging.getLogger(__name__)
 
@@ -49,9 +52,10 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     settings = get_settings()
+    group_id = settings.group_id
 
     # Only process messages from the configured group
-    if update.effective_chat and update.effective_chat.id != settings.group_id:
+    if update.effective_chat and update.effective_chat.id != group_id:
         return
 
     user = update.message.from_user
@@ -60,8 +64,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if user.is_bot:
         return
 
-    # Check if user has complete profile (photo + username)
-    result = await check_user_profile(context.bot, user)
+    # Check if user has complete profile (photo + username); a recent photo
+    # check is reused so every message doesn't cost an API call
+    result = await check_user_profile(context.bot, user, use_cache=True)
 
     # User has complete profile, nothing to do
     if result.is_complete:
@@ -72,6 +77,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     missing_text = MISSING_ITEMS_SEPARATOR.join(missing)
     user_mention = get_user_mention(user)
 
+    # All notices go to the warning topic with the same options
+    send_notice = partial(
+        context.bot.send_message,
+        chat_id=group_id,
+        message_thread_id=settings.warning_topic_id,
+        parse_mode="HTML",
+    )
+
     # Warning mode: just send warning, don't restrict
     if not settings.restrict_failed_users:
         threshold_display = format_threshold_display(
@@ -83,78 +96,81 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             threshold_display=threshold_display,
             rules_link=settings.rules_link,
         )
-        await context.bot.send_message(
-            chat_id=settings.group_id,
-            message_thread_id=settings.warning_topic_id,
-            text=warning_message,
-            parse_mode="Markdown",
-        )
+        await send_notice(text=warning_message)
         logger.info(
-            f"Warned user {user.id} ({user.full_name}) for missing: {missing_text} (group_id={settings.group_id})"
+            "Warned user %s (%s) for missing: %s (group_id=%s)",
+            user.id,
+            user.full_name,
+            missing_text,
+            group_id,
         )
         return
 
-    # Progressive restriction mode: track messages and restrict at threshold
-    db = get_database()
-    record = db.get_or_create_user_warning(user.id, settings.group_id)
-
-    # First message: send warning with threshold info
-    if record.message_count == 1:
-        threshold_display = format_threshold_display(
-            settings.warning_time_threshold_minutes
-        )
-        warning_message = WARNING_MESSAGE_WITH_THRESHOLD.format(
-            user_mention=user_mention,
-            missing_text=missing_text,
-            warning_threshold=settings.warning_threshold,
-            threshold_display=threshold_display,
-            rules_link=settings.rules_link,
-        )
-        await context.bot.send_message(
-            chat_id=settings.group_id,
-            message_thread_id=settings.warning_topic_id,
-            text=warning_message,
-            parse_mode="Markdown",
-        )
-        logger.info(
-            f"First warning for user {user.id} ({user.full_name}) for missing: {missing_text} (group_id={settings.group_id})"
-        )
-
-    # Threshold reached: restrict user
-    if record.message_count >= settings.warning_threshold:
-        # Apply restriction (mute user)
-        await context.bot.restrict_chat_member(
-            chat_id=settings.group_id,
-            user_id=user.id,
-            permissions=RESTRICTED_PERMISSIONS,
-        )
-        db.mark_user_restricted(user.id, settings.group_id)
-
-        # Get bot username for DM link (cached to avoid repeated API calls)
-        bot_username = await BotInfoCache.get_username(context.bot)
-        dm_link = f"https://t.me/{bot_username}"
-
-        # Send restriction notice with DM link for appeal
-        restriction_message = RESTRICTION_MESSAGE_AFTER_MESSAGES.format(
-            user_mention=user_mention,
-            message_count=record.message_count,
-            missing_text=missing_text,
-            rules_link=settings.rules_link,
-            dm_link=dm_link,
-        )
-        await context.bot.send_message(
-            chat_id=settings.group_id,
-            message_thread_id=settings.warning_topic_id,
-            text=restriction_message,
-            parse_mode="Markdown",
-        )
-        logger.info(
-            f"Restricted user {user.id} ({user.full_name}) after {record.message_count} messages (group_id={settings.group_id})"
-        )
-    else:
-        # Not at threshold yet: silently increment count (no spam)
-        db.increment_message_count(user.id, settings.group_id)
-        logger.debug(
-            f"Silent increment for user {user.id} ({user.full_name}), "
-            f"count: {record.message_count + 1}"
-        )
+    # Progressive restriction mode: count the message (one upsert) and
+    # restrict at threshold. Updates run concurrently, so counting and
+    # restricting are serialized per user to restrict only once
+    async with get_user_lock(group_id, user.id):
+        db = get_database()
+        record = db.record_user_message(user.id, group_id)
+
+        # First message: send warning with threshold info
+        if record.message_count == 1:
+            threshold_display = format_threshold_display(
+                settings.warning_time_threshold_minutes
+            )
+            warning_message = WARNING_MESSAGE_WITH_THRESHOLD.format(
+                user_mention=user_mention,
+                missing_text=missing_text,
+                warning_threshold=settings.warning_threshold,
+                threshold_display=threshold_display,
+                rules_link=settings.rules_link,
+            )
+            await send_notice(text=warning_message)
+            logger.info(
+                "First warning for user %s (%s) for missing: %s (group_id=%s)",
+                user.id,
+                user.full_name,
+                missing_text,
+                group_id,
+            )
+
+        # Threshold reached: restrict user
+        if record.message_count >= settings.warning_threshold:
+            # Apply restriction (mute user) while fetching the bot username for
+            # the DM link (cached to avoid repeated API calls); the two are
+            # independent, so don't wait for one before starting the other
+            _, bot_username = await asyncio.gather(
+                context.bot.restrict_chat_member(
+                    chat_id=group_id,
+                    user_id=user.id,
+                    permissions=RESTRICTED_PERMISSIONS,
+                ),
+                BotInfoCache.get_username(context.bot),
+            )
+            db.mark_user_restricted(user.id, group_id)
+            dm_link = f"https://t.me/{bot_username}"
+
+            # Send restriction notice with DM link for appeal
+            restriction_message = RESTRICTION_MESSAGE_AFTER_MESSAGES.format(
+                user_mention=user_mention,
+                message_count=record.message_count,
+                missing_text=missing_text,
+                rules_link=settings.rules_link,
+                dm_link=dm_link,
+            )
+            await send_notice(text=restriction_message)
+            logger.info(
+                "Restricted user %s (%s) after %s messages (group_id=%s)",
+                user.id,
+                user.full_name,
+                record.message_count,
+                group_id,
+            )
+        else:
+            # Not at threshold yet: message already counted above (no spam)
+            logger.debug(
+                "Silent increment for user %s (%s), count: %s",
+                user.id,
+                user.full_name,
+                record.message_count,
+            )
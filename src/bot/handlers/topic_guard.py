@@ -8,14 +8,38 @@ post in the warning topic.
 
 import logging
 
-from telegram import Update
-from telegram.ext import ContextTypes
+from telegram import Message, Update
+from telegram.constants import ChatMemberStatus
+from telegram.ext import ContextTypes, filters
 
 from bot.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+class WarningTopicFilter(filters.MessageFilter):
+    """
+    Filter for messages posted in the warning topic.
+
+    Lets the topic guard be registered only for the warning topic, so
+    messages in other topics never reach the handler.
+    """
+
+    def __init__(self, topic_id: int):
+        """
+        Initialize the filter.
+
+        Args:
+            topic_id: Warning topic ID (message_thread_id).
+        """
+        super().__init__(name=f"WarningTopicFilter({topic_id})")
+        self.topic_id = topic_id
+
+    def filter(self, message: Message) -> bool:
+        """Return True if the message was posted in the warning topic."""
+        return message.message_thread_id == self.topic_id
+
+
 async def guard_warning_topic(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Delete messages from non-admins in the warning topic.
@@ -58,7 +82,7 @@ async def guard_warning_topic(update: Update, context: ContextTypes.DEFAULT_TYPE
         user_id=user.id,
     )
 
-    admin_statuses = ("administrator", "creator")
+    admin_statuses = (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
     if chat_member.status in admin_statuses:
         return
 
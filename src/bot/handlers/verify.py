@@ -6,9 +6,11 @@ manage the photo verification whitelist for users whose profile pictures are
 hidden due to Telegram privacy settings.
 """
 
+import asyncio
 import logging
 
 from telegram import Update
+from telegram.constants import ChatType
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
@@ -16,81 +18,123 @@ from bot.config import get_settings
 from bot.constants import VERIFICATION_CLEARANCE_MESSAGE
 from bot.database.service import get_database
 from bot.services.telegram_utils import get_user_mention_by_id, unrestrict_user
+from bot.services.user_checker import ProfilePhotoCache
 
 logger = logging.getLogger(__name__)
 
 
-async def handle_verify_command(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
-) -> None:
+async def _parse_admin_command(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, command: str
+) -> tuple[int, int] | None:
     """
-    Handle /verify command to whitelist users for profile picture verification.
+    Validate an admin DM command and parse its USER_ID argument.
 
-    Usage: /verify USER_ID (e.g., /verify 123456789)
-
-    This command allows admins to manually verify users whose profile pictures
-    are hidden due to Telegram privacy settings. Only works in bot DMs.
+    Replies to the sender with the reason when the command is rejected
+    (not in a DM, sender is not an admin, missing or non-numeric user ID).
 
     Args:
         update: Telegram update containing the command.
         context: Bot context with helper methods.
+        command: Command name without the slash, used in replies and logs.
+
+    Returns:
+        tuple[int, int] | None: (admin_user_id, target_user_id), or None if
+            the command was rejected.
     """
     if not update.message or not update.message.from_user:
-        return
+        return None
 
-    if update.effective_chat and update.effective_chat.type != "private":
+    if update.effective_chat and update.effective_chat.type != ChatType.PRIVATE:
         await update.message.reply_text(
             "❌ Perintah ini hanya bisa digunakan di chat pribadi dengan bot."
         )
-        return
+        return None
 
     admin_user_id = update.message.from_user.id
-    admin_ids = context.bot_data.get("admin_ids", [])
+    admin_ids: frozenset[int] = context.bot_data.get("admin_ids", frozenset())
 
     if admin_user_id not in admin_ids:
         await update.message.reply_text("❌ Kamu tidak memiliki izin untuk menggunakan perintah ini.")
         logger.warning(
-            f"Non-admin user {admin_user_id} ({update.message.from_user.full_name}) "
-            f"attempted to use /verify command"
+            "Non-admin user %s (%s) attempted to use /%s command",
+            admin_user_id,
+            update.message.from_user.full_name,
+            command,
         )
-        return
+        return None
+
+    if not context.args:
+        await update.message.reply_text(f"❌ Penggunaan: /{command} USER_ID")
+        return None
+
+    try:
+        target_user_id = int(context.args[0])
+    except ValueError:
+        await update.message.reply_text("❌ User ID harus berupa angka.")
+        return None
 
-    if context.args and len(context.args) > 0:
-        try:
-            target_user_id = int(context.args[0])
-        except ValueError:
-            await update.message.reply_text("❌ User ID harus berupa angka.")
-            return
-    else:
-        await update.message.reply_text("❌ Penggunaan: /verify USER_ID")
+    return admin_user_id, target_user_id
+
+
+async def handle_verify_command(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """
+    Handle /verify command to whitelist users for profile picture verification.
+
+    Usage: /verify USER_ID (e.g., /verify 123456789)
+
+    This command allows admins to manually verify users whose profile pictures
+    are hidden due to Telegram privacy settings. Only works in bot DMs.
+
+    Args:
+        update: Telegram update containing the command.
+        context: Bot context with helper methods.
+    """
+    parsed = await _parse_admin_command(update, context, "verify")
+    if parsed is None:
         return
+    admin_user_id, target_user_id = parsed
 
     db = get_database()
+    settings = get_settings()
 
     try:
-        db.add_photo_verification_whitelist(
+        # Whitelist the user and delete all their warning records in one
+        # transaction
+        deleted_count = db.verify_user(
             user_id=target_user_id,
             verified_by_admin_id=admin_user_id,
+            group_id=settings.group_id,
         )
-        
-        # Get settings for group_id
-        settings = get_settings()
-
-        # Unrestrict user if they are restricted
-        try:
-            await unrestrict_user(context.bot, settings.group_id, target_user_id)
-            logger.info(f"Unrestricted user {target_user_id} during verification")
-        except BadRequest as e:
+        ProfilePhotoCache.invalidate(target_user_id)
+
+        # Unrestrict user if they are restricted and, if they had warnings,
+        # fetch their name for the clearance message at the same time
+        pending = [unrestrict_user(context.bot, settings.group_id, target_user_id)]
+        if deleted_count > 0:
+            pending.append(context.bot.get_chat(target_user_id))
+        results = await asyncio.gather(*pending, return_exceptions=True)
+
+        unrestrict_result = results[0]
+        if isinstance(unrestrict_result, BadRequest):
             # User might not be restricted or not in group - that's okay
-            logger.debug(f"Could not unrestrict user {target_user_id}: {e}")
+            logger.debug(
+                "Could not unrestrict user %s: %s",
+                target_user_id,
+                unrestrict_result,
+            )
+        elif isinstance(unrestrict_result, BaseException):
+            raise unrestrict_result
+        else:
+            logger.info("Unrestricted user %s during verification", target_user_id)
 
-        # Delete all warning records for this user
-        deleted_count = db.delete_user_warnings(target_user_id, settings.group_id)
-        
         # Send notification to warning topic if user had previous warnings
         if deleted_count > 0:
-            # Get user info for proper mention
-            user_info = await context.bot.get_chat(target_user_id)
+            user_info = results[1]
+            if isinstance(user_info, BaseException):
+                raise user_info
+
             user_mention = get_user_mention_by_id(target_user_id, user_info.full_name)
             
             # Send clearance message to warning topic
@@ -101,10 +145,17 @@ async def handle_verify_command(
                 chat_id=settings.group_id,
                 message_thread_id=settings.warning_topic_id,
                 text=clearance_message,
-                parse_mode="Markdown"
+                parse_mode="HTML"
+            )
+            logger.info(
+                "Sent clearance notification to warning topic for user %s",
+                target_user_id,
+            )
+            logger.info(
+                "Deleted %s warning record(s) for user %s",
+                deleted_count,
+                target_user_id,
             )
-            logger.info(f"Sent clearance notification to warning topic for user {target_user_id}")
-            logger.info(f"Deleted {deleted_count} warning record(s) for user {target_user_id}")
         
         await update.message.reply_text(
             f"✅ User dengan ID {target_user_id} telah diverifikasi:\n"
@@ -114,13 +165,18 @@ async def handle_verify_command(
             f"User ini tidak akan dicek foto profil lagi."
         )
         logger.info(
-            f"Admin {admin_user_id} ({update.message.from_user.full_name}) "
-            f"whitelisted user {target_user_id} for photo verification"
+            "Admin %s (%s) whitelisted user %s for photo verification",
+            admin_user_id,
+            update.message.from_user.full_name,
+            target_user_id,
         )
     except ValueError as e:
         await update.message.reply_text(f"ℹ️ User dengan ID {target_user_id} sudah ada di whitelist.")
         logger.info(
-            f"Admin {admin_user_id} tried to whitelist {target_user_id} but already exists: {e}"
+            "Admin %s tried to whitelist %s but already exists: %s",
+            admin_user_id,
+            target_user_id,
+            e,
         )
 
 
@@ -139,49 +195,30 @@ async def handle_unverify_command(
         update: Telegram update containing the command.
         context: Bot context with helper methods.
     """
-    if not update.message or not update.message.from_user:
-        return
-
-    if update.effective_chat and update.effective_chat.type != "private":
-        await update.message.reply_text(
-            "❌ Perintah ini hanya bisa digunakan di chat pribadi dengan bot."
-        )
-        return
-
-    admin_user_id = update.message.from_user.id
-    admin_ids = context.bot_data.get("admin_ids", [])
-
-    if admin_user_id not in admin_ids:
-        await update.message.reply_text("❌ Kamu tidak memiliki izin untuk menggunakan perintah ini.")
-        logger.warning(
-            f"Non-admin user {admin_user_id} ({update.message.from_user.full_name}) "
-            f"attempted to use /unverify command"
-        )
-        return
-
-    if context.args and len(context.args) > 0:
-        try:
-            target_user_id = int(context.args[0])
-        except ValueError:
-            await update.message.reply_text("❌ User ID harus berupa angka.")
-            return
-    else:
-        await update.message.reply_text("❌ Penggunaan: /unverify USER_ID")
+    parsed = await _parse_admin_command(update, context, "unverify")
+    if parsed is None:
         return
+    admin_user_id, target_user_id = parsed
 
     db = get_database()
 
     try:
         db.remove_photo_verification_whitelist(user_id=target_user_id)
+        ProfilePhotoCache.invalidate(target_user_id)
         await update.message.reply_text(
             f"✅ User dengan ID {target_user_id} telah dihapus dari whitelist verifikasi foto."
         )
         logger.info(
-            f"Admin {admin_user_id} ({update.message.from_user.full_name}) "
-            f"removed user {target_user_id} from photo verification whitelist"
+            "Admin %s (%s) removed user %s from photo verification whitelist",
+            admin_user_id,
+            update.message.from_user.full_name,
+            target_user_id,
         )
     except ValueError as e:
         await update.message.reply_text(f"ℹ️ User dengan ID {target_user_id} tidak ada di whitelist.")
         logger.info(
-            f"Admin {admin_user_id} tried to remove {target_user_id} but not in whitelist: {e}"
+            "Admin %s tried to remove %s but not in whitelist: %s",
+            admin_user_id,
+            target_user_id,
+            e,
         )
@@ -2,7 +2,8 @@
 Main entry point for the PythonID bot.
 
 This module initializes the bot application, registers all message handlers,
-and starts the polling loop. Handler registration order matters:
+and starts receiving updates (webhook if WEBHOOK_URL is set, otherwise
+polling). Handler registration order matters:
 1. Topic guard (group -1): Runs first to delete unauthorized messages
 2. DM handler: Processes private messages for unrestriction flow
 3. Message handler: Monitors group messages for profile compliance
@@ -10,15 +11,23 @@ and starts the polling loop. Handler registration order matters:
 
 import logging
 
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.error import TelegramError
+from telegram.ext import (
+    AIORateLimiter,
+    Application,
+    CommandHandler,
+    MessageHandler,
+    filters,
+)
 
 from bot.config import get_settings
 from bot.database.service import init_database
 from bot.handlers import captcha
 from bot.handlers.dm import handle_dm
 from bot.handlers.message import handle_message
-from bot.handlers.topic_guard import guard_warning_topic
+from bot.handlers.topic_guard import WarningTopicFilter, guard_warning_topic
 from bot.handlers.verify import handle_verify_command, handle_unverify_command
+from bot.services.bot_info import BotInfoCache
 from bot.services.scheduler import auto_restrict_expired_warnings
 from bot.services.telegram_utils import fetch_group_admin_ids
 
@@ -29,14 +38,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Update types the bot handles; everything else is not delivered at all
+ALLOWED_UPDATES = ["message", "callback_query", "chat_member"]
+
 
 async def post_init(application: Application) -> None:  # type: ignore[type-arg]
     """
     Post-initialization callback to fetch and cache group admin IDs.
 
     This runs once after the bot starts and before polling begins.
-    Fetches admin list from the monitored group and stores it in bot_data.
-    Also recovers any pending captcha verifications from database.
+    Fetches admin list from the monitored group and stores it in bot_data
+    as a frozenset, so admin checks are constant-time membership tests.
+    Replace the whole value (e.g. existing | {new_id}) rather than mutating.
+    Also warms the bot username cache and recovers any pending captcha
+    verifications from database.
 
     Args:
         application: The Application instance.
@@ -44,11 +59,18 @@ async def post_init(application: Application) -> None:  # type: ignore[type-arg]
     settings = get_settings()
     try:
         admin_ids = await fetch_group_admin_ids(application.bot, settings.group_id)  # type: ignore[arg-type]
-        application.bot_data["admin_ids"] = admin_ids  # type: ignore[index]
+        application.bot_data["admin_ids"] = frozenset(admin_ids)  # type: ignore[index]
         logger.info(f"Fetched {len(admin_ids)} admin(s) from group {settings.group_id}")
     except Exception as e:
         logger.error(f"Failed to fetch admin IDs: {e}")
-        application.bot_data["admin_ids"] = []  # type: ignore[index]
+        application.bot_data["admin_ids"] = frozenset()  # type: ignore[index]
+
+    # Warm the username cache so captcha recovery and the scheduler's first
+    # run don't each start with a get_me() call
+    try:
+        await BotInfoCache.get_username(application.bot)
+    except TelegramError as e:
+        logger.error(f"Failed to fetch bot username: {e}")
 
     # Recover pending captcha verifications
     if settings.captcha_enabled:
@@ -72,17 +94,35 @@ def main() -> None:
     # Initialize database (creates tables if they don't exist)
     init_database(settings.database_path)
 
-    # Build the bot application with the token
-    application = Application.builder().token(settings.telegram_bot_token).build()
+    # Build the bot application with the token. Outgoing API calls go through
+    # PTB's rate limiter so bursts (mass joins, spam waves) are paced to
+    # Telegram's global and per-group limits instead of hitting 429s. The
+    # overall rate stays a little under the 30/s limit, and a 429 that still
+    # slips through is retried after the requested delay
+    #
+    # Updates are handled concurrently so one slow API call (e.g. a captcha
+    # restriction) doesn't hold up unrelated updates. Handlers that check and
+    # then act on per-user state serialize on get_user_lock()
+    application = (
+        Application.builder()
+        .token(settings.telegram_bot_token)
+        .concurrent_updates(True)
+        .rate_limiter(AIORateLimiter(overall_max_rate=28, max_retries=3))
+        .build()
+    )
 
     # Set post_init callback to fetch admin IDs on startup
     application.post_init = post_init
 
+    # Updates from other chats are dropped by the filters, before the group
+    # handlers are even called
+    group_chat = filters.Chat(chat_id=settings.group_id)
+
     # Handler 1: Topic guard - runs first (group -1) to delete unauthorized
     # messages in the warning topic before other handlers process them
     application.add_handler(
         MessageHandler(
-            filters.ALL & ~filters.COMMAND,
+            group_chat & WarningTopicFilter(settings.warning_topic_id) & ~filters.COMMAND,
             guard_warning_topic,
         ),
         group=-1,
@@ -116,7 +156,7 @@ def main() -> None:
     # group and warns/restricts users with incomplete profiles
     application.add_handler(
         MessageHandler(
-            filters.TEXT & ~filters.COMMAND,
+            group_chat & filters.TEXT & ~filters.COMMAND,
             handle_message,
         )
     )
@@ -132,8 +172,20 @@ def main() -> None:
 
     logger.info(f"Bot started. Monitoring group {settings.group_id}")
     logger.info("JobQueue started with auto-restriction job (every 5 minutes)")
-    
-    application.run_polling(allowed_updates=["message", "callback_query", "chat_member"])
+
+    if settings.webhook_url:
+        # Telegram pushes updates to us; the token in the path keeps the
+        # endpoint from being guessed
+        logger.info(f"Receiving updates via webhook on port {settings.webhook_port}")
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=settings.webhook_port,
+            url_path=settings.telegram_bot_token,
+            webhook_url=f"{settings.webhook_url.rstrip('/')}/{settings.telegram_bot_token}",
+            allowed_updates=ALLOWED_UPDATES,
+        )
+    else:
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == "__main__":
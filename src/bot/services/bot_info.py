@@ -1,12 +1,15 @@
 """
 Bot info caching service for the PythonID bot.
 
-This module provides a simple cache for bot information (like username)
-to avoid repeated API calls. The bot's username rarely changes, so
-caching it after the first fetch is efficient.
+This module provides simple caches for bot and group information (like the
+bot's username and the group's default permissions) to avoid repeated API
+calls. Both rarely change, so caching them after the first fetch is efficient.
 """
 
-from telegram import Bot
+import time
+from typing import ClassVar
+
+from telegram import Bot, ChatPermissions
 
 
 class BotInfoCache:
@@ -46,3 +49,52 @@ class BotInfoCache:
         Clear the cached username (primarily for testing).
         """
         cls._username = None
+
+
+class GroupPermissionsCache:
+    """
+    Cache for group default permissions.
+
+    Caches the result of get_chat() per group for TTL_SECONDS so that
+    unrestricting users doesn't cost an extra API call every time. The
+    TTL lets changes made by admins in the group settings be picked up.
+
+    Usage:
+        permissions = await GroupPermissionsCache.get_permissions(bot, group_id)
+    """
+
+    # Seconds before cached permissions are fetched again
+    TTL_SECONDS = 300
+
+    # Class-level cache: group_id -> (permissions, expires_at)
+    _entries: ClassVar[dict[int, tuple[ChatPermissions | None, float]]] = {}
+
+    @classmethod
+    async def get_permissions(
+        cls, bot: Bot, group_id: int
+    ) -> ChatPermissions | None:
+        """
+        Get group's default permissions, fetching from API when expired.
+
+        Args:
+            bot: Telegram bot instance.
+            group_id: Telegram group ID.
+
+        Returns:
+            ChatPermissions | None: Group's default member permissions.
+        """
+        now = time.monotonic()
+        entry = cls._entries.get(group_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        chat = await bot.get_chat(group_id)
+        cls._entries[group_id] = (chat.permissions, now + cls.TTL_SECONDS)
+        return chat.permissions
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clear the cached permissions (primarily for testing).
+        """
+        cls._entries = {}
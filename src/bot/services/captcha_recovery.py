@@ -6,21 +6,31 @@ Since JobQueue is in-memory, pending verifications need to be recovered
 from the database to prevent users from being stuck in restricted state.
 """
 
+import asyncio
 import logging
 from datetime import UTC, datetime
 
 from telegram import Bot
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import Application
 
 from bot.config import get_settings
 from bot.constants import CAPTCHA_TIMEOUT_MESSAGE
+from bot.database.models import PendingCaptchaValidation
 from bot.database.service import get_database
-from bot.handlers.captcha import captcha_timeout_callback, get_captcha_job_name
+from bot.handlers.captcha import (
+    CaptchaJobData,
+    captcha_timeout_callback,
+    get_captcha_job_name,
+)
 from bot.services.bot_info import BotInfoCache
 from bot.services.telegram_utils import get_user_mention_by_id
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of already-expired captchas handled concurrently on startup
+MAX_CONCURRENT_EXPIRATIONS = 8
+
 
 async def handle_captcha_expiration(
     bot: Bot,
@@ -45,13 +55,10 @@ async def handle_captcha_expiration(
         user_full_name: The user's full name.
     """
     db = get_database()
-    pending = db.get_pending_captcha(user_id, group_id)
-    if not pending:
-        logger.debug(f"No pending captcha for user {user_id}, already verified")
+    if db.pop_pending_captcha(user_id, group_id) is None:
+        logger.debug("No pending captcha for user %s, already verified", user_id)
         return
 
-    db.remove_pending_captcha(user_id, group_id)
-
     # Create UserWarning to track this bot-applied restriction
     # Allows DM handler to unrestrict user later when profile is complete
     warning = db.get_or_create_user_warning(user_id, group_id)
@@ -59,7 +66,7 @@ async def handle_captcha_expiration(
         db.mark_user_restricted(user_id, group_id)
 
     bot_username = await BotInfoCache.get_username(bot)
-    dm_link = f"[hubungi robot](https://t.me/{bot_username})"
+    dm_link = f'<a href="https://t.me/{bot_username}">hubungi robot</a>'
     user_mention = get_user_mention_by_id(user_id, user_full_name)
 
     try:
@@ -70,12 +77,12 @@ async def handle_captcha_expiration(
                 user_mention=user_mention,
                 dm_link=dm_link,
             ),
-            parse_mode="Markdown",
+            parse_mode="HTML",
         )
     except Exception as e:
-        logger.error(f"Failed to edit captcha timeout message: {e}")
+        logger.error("Failed to edit captcha timeout message: %s", e)
 
-    logger.info(f"User {user_id} captcha timeout - kept restricted")
+    logger.info("User %s captcha timeout - kept restricted", user_id)
 
 
 async def recover_pending_captchas(application: Application) -> None:
@@ -83,8 +90,9 @@ async def recover_pending_captchas(application: Application) -> None:
     Recover pending captcha verifications on bot startup.
 
     Queries the database for all pending captcha records and:
-    1. If timeout has already passed: immediately expire them
-    2. If timeout hasn't passed yet: reschedule the timeout job
+    1. If timeout hasn't passed yet: reschedule the timeout job
+    2. If timeout has already passed: expire them, concurrently (at most
+       MAX_CONCURRENT_EXPIRATIONS at a time)
 
     This prevents users from being stuck in restricted state after bot restart.
 
@@ -100,37 +108,32 @@ async def recover_pending_captchas(application: Application) -> None:
         logger.info("No pending captcha verifications to recover")
         return
 
-    logger.info(f"Recovering {len(pending_records)} pending captcha verification(s)")
+    logger.info("Recovering %s pending captcha verification(s)", len(pending_records))
 
     now = datetime.now(UTC)
+    timeout_seconds = settings.captcha_timeout_seconds
+    expired_records = []
 
     for record in pending_records:
         try:
-            # Make created_at timezone-aware (SQLite stores without timezone)
-            created_at_utc = record.created_at.replace(tzinfo=UTC)
-            elapsed_seconds = (now - created_at_utc).total_seconds()
-            remaining_seconds = settings.captcha_timeout_seconds - elapsed_seconds
+            # created_at is loaded timezone-aware (UTCDateTime column)
+            elapsed_seconds = (now - record.created_at).total_seconds()
+            remaining_seconds = timeout_seconds - elapsed_seconds
 
             if remaining_seconds <= 0:
-                # Timeout has already passed, expire immediately
+                # Timeout has already passed, expire after scheduling the rest
                 logger.info(
-                    f"Expiring captcha for user {record.user_id} "
-                    f"(timeout passed {abs(remaining_seconds):.0f}s ago)"
-                )
-
-                await handle_captcha_expiration(
-                    bot=application.bot,
-                    user_id=record.user_id,
-                    group_id=record.group_id,
-                    chat_id=record.chat_id,
-                    message_id=record.message_id,
-                    user_full_name=record.user_full_name,
+                    "Expiring captcha for user %s (timeout passed %.0fs ago)",
+                    record.user_id,
+                    abs(remaining_seconds),
                 )
+                expired_records.append(record)
             else:
                 # Timeout hasn't passed yet, reschedule the job
                 logger.info(
-                    f"Rescheduling captcha timeout for user {record.user_id} "
-                    f"(remaining: {remaining_seconds:.0f}s)"
+                    "Rescheduling captcha timeout for user %s (remaining: %.0fs)",
+                    record.user_id,
+                    remaining_seconds,
                 )
 
                 job_name = get_captcha_job_name(record.group_id, record.user_id)
@@ -139,19 +142,54 @@ async def recover_pending_captchas(application: Application) -> None:
                     captcha_timeout_callback,
                     when=remaining_seconds,
                     name=job_name,
-                    data={
-                        "user_id": record.user_id,
-                        "group_id": record.group_id,
-                        "chat_id": record.chat_id,
-                        "message_id": record.message_id,
-                        "user_full_name": record.user_full_name,
-                    },
+                    data=CaptchaJobData(
+                        user_id=record.user_id,
+                        group_id=record.group_id,
+                        chat_id=record.chat_id,
+                        message_id=record.message_id,
+                        user_full_name=record.user_full_name,
+                    ),
                 )
         except Exception as e:
             logger.error(
-                f"Failed to recover captcha for user {record.user_id}: {e}",
+                "Failed to recover captcha for user %s: %s",
+                record.user_id,
+                e,
                 exc_info=True,
             )
             continue
 
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXPIRATIONS)
+
+    async def expire(record: PendingCaptchaValidation) -> None:
+        async with semaphore:
+            await handle_captcha_expiration(
+                bot=application.bot,
+                user_id=record.user_id,
+                group_id=record.group_id,
+                chat_id=record.chat_id,
+                message_id=record.message_id,
+                user_full_name=record.user_full_name,
+            )
+
+    results = await asyncio.gather(
+        *(expire(record) for record in expired_records),
+        return_exceptions=True,
+    )
+    for record, result in zip(expired_records, results):
+        if isinstance(result, (Forbidden, BadRequest)):
+            # Expected API refusals; no traceback needed
+            logger.info(
+                "Skipped captcha expiry for user %s: %s",
+                record.user_id,
+                result,
+            )
+        elif isinstance(result, Exception):
+            logger.error(
+                "Failed to recover captcha for user %s: %s",
+                record.user_id,
+                result,
+                exc_info=result,
+            )
+
     logger.info("Captcha recovery complete")
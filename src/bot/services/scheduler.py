@@ -5,31 +5,118 @@ This module manages periodic tasks like auto-restricting users who exceed
 time thresholds for profile completion.
 """
 
+import asyncio
 import logging
+from collections.abc import Callable
+from functools import partial
 
+from telegram import Bot
 from telegram.constants import ChatMemberStatus
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import ContextTypes
 
-
-from bot.config import get_settings
+from bot.config import Settings, get_settings
 from bot.constants import (
     RESTRICTED_PERMISSIONS,
     RESTRICTION_MESSAGE_AFTER_TIME,
     format_threshold_display,
 )
+from bot.database.models import UserWarning
 from bot.database.service import get_database
 from bot.services.bot_info import BotInfoCache
-from bot.services.telegram_utils import get_user_mention, get_user_status
+from bot.services.telegram_utils import get_user_mention
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of expired warnings processed concurrently, and the number
+# recorded in the database per batch
+MAX_CONCURRENT_RESTRICTIONS = 10
+
+
+async def _restrict_expired_warning(
+    bot: Bot,
+    warning: UserWarning,
+    settings: Settings,
+    format_message: Callable[..., str],
+    restricted_user_ids: list[int],
+    kicked_user_ids: list[int],
+) -> None:
+    """
+    Restrict a single user whose warning exceeded the time threshold.
+
+    Appends the user ID to restricted_user_ids once the restriction has been
+    applied on Telegram, so it is marked in the database even if the
+    notification fails afterwards. Kicked users are appended to
+    kicked_user_ids instead so their warnings can be dropped.
+
+    Args:
+        bot: Telegram bot instance.
+        warning: Expired warning record.
+        settings: Bot settings.
+        format_message: RESTRICTION_MESSAGE_AFTER_TIME.format with everything
+            but user_mention already bound.
+        restricted_user_ids: Collects users restricted on Telegram.
+        kicked_user_ids: Collects users found kicked from the group.
+    """
+    group_id = settings.group_id
+    user_id = warning.user_id
+
+    # One lookup serves both the kicked check and the notification mention.
+    # Other errors (e.g. network timeouts) propagate so the user is skipped
+    # this run rather than restricted without the kicked check
+    try:
+        member = await bot.get_chat_member(chat_id=group_id, user_id=user_id)
+    except (BadRequest, Forbidden):
+        member = None
+
+    # Skip if user is kicked (can't rejoin without admin re-invite). Their
+    # warning is dropped so later runs don't look the user up again
+    if member is not None and member.status == ChatMemberStatus.BANNED:
+        kicked_user_ids.append(user_id)
+        logger.info(
+            "Skipped auto-restriction for user %s - user kicked (group_id=%s)",
+            user_id,
+            group_id,
+        )
+        return
+
+    # Apply restriction (even if user left, they'll be restricted when they rejoin)
+    await bot.restrict_chat_member(
+        chat_id=group_id,
+        user_id=user_id,
+        permissions=RESTRICTED_PERMISSIONS,
+    )
+    restricted_user_ids.append(user_id)
+
+    # Fallback to user ID if we couldn't get user info
+    user_mention = (
+        get_user_mention(member.user) if member is not None else f"User {user_id}"
+    )
+
+    # Send notification to warning topic
+    await bot.send_message(
+        chat_id=group_id,
+        message_thread_id=settings.warning_topic_id,
+        text=format_message(user_mention=user_mention),
+        parse_mode="HTML",
+    )
+
+    logger.info(
+        "Auto-restricted user %s after %s minutes (group_id=%s)",
+        user_id,
+        settings.warning_time_threshold_minutes,
+        group_id,
+    )
+
 
 async def auto_restrict_expired_warnings(context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Periodically check and restrict users who exceeded time threshold.
 
     Finds all active warnings past the configured hours threshold and
-    applies restrictions (mutes) to those users.
+    applies restrictions (mutes) to those users. Users are processed
+    concurrently in chunks of MAX_CONCURRENT_RESTRICTIONS, recording each
+    chunk in the database as soon as it completes.
 
     Args:
         context: Telegram job context for sending messages.
@@ -46,67 +133,66 @@ async def auto_restrict_expired_warnings(context: ContextTypes.DEFAULT_TYPE) ->
         logger.debug("No expired warnings to process")
         return
 
-    logger.info(f"Processing {len(expired_warnings)} expired warnings")
+    logger.info("Processing %s expired warnings", len(expired_warnings))
 
     # Get bot username once for all DM links
     bot = context.bot
     bot_username = await BotInfoCache.get_username(bot)
     dm_link = f"https://t.me/{bot_username}"
 
-    for warning in expired_warnings:
-        try:
-            # Check if user is kicked
-            user_status = await get_user_status(bot, settings.group_id, warning.user_id)
-            
-            # Skip if user is kicked (can't rejoin without admin re-invite)
-            if user_status == ChatMemberStatus.BANNED:
-                db.mark_user_unrestricted(warning.user_id, settings.group_id)
+    # Everything in the notification except the mention is the same per run
+    format_message = partial(
+        RESTRICTION_MESSAGE_AFTER_TIME.format,
+        threshold_display=format_threshold_display(
+            settings.warning_time_threshold_minutes
+        ),
+        rules_link=settings.rules_link,
+        dm_link=dm_link,
+    )
+
+    # Warnings are handled in chunks of MAX_CONCURRENT_RESTRICTIONS, and each
+    # chunk's results are written to the database in one batch before the
+    # next starts. Restrictions applied on Telegram are then recorded within
+    # one chunk's worth of API calls, and a cancelled or crashed run loses at
+    # most the chunk in flight
+    for start in range(0, len(expired_warnings), MAX_CONCURRENT_RESTRICTIONS):
+        chunk = expired_warnings[start : start + MAX_CONCURRENT_RESTRICTIONS]
+        restricted_user_ids: list[int] = []
+        kicked_user_ids: list[int] = []
+
+        results = await asyncio.gather(
+            *(
+                _restrict_expired_warning(
+                    bot,
+                    warning,
+                    settings,
+                    format_message,
+                    restricted_user_ids,
+                    kicked_user_ids,
+                )
+                for warning in chunk
+            ),
+            return_exceptions=True,
+        )
+
+        db.mark_users_restricted(restricted_user_ids, settings.group_id)
+        db.delete_users_warnings(kicked_user_ids, settings.group_id)
+
+        for warning, result in zip(chunk, results):
+            if isinstance(result, (Forbidden, BadRequest)):
+                # Expected API refusals (e.g. user gone, bot lacks rights); no
+                # traceback needed
                 logger.info(
-                    f"Skipped auto-restriction for user {warning.user_id} - user kicked (group_id={settings.group_id})"
+                    "Skipped auto-restricting user %s in group %s: %s",
+                    warning.user_id,
+                    settings.group_id,
+                    result,
                 )
-                continue
-            
-            # Apply restriction (even if user left, they'll be restricted when they rejoin)
-            await bot.restrict_chat_member(
-                chat_id=settings.group_id,
-                user_id=warning.user_id,
-                permissions=RESTRICTED_PERMISSIONS,
-            )
-            db.mark_user_restricted(warning.user_id, settings.group_id)
-
-            # Get user info for proper mention
-            try:
-                user_member = await bot.get_chat_member(
-                    chat_id=settings.group_id,
-                    user_id=warning.user_id,
+            elif isinstance(result, Exception):
+                logger.error(
+                    "Error auto-restricting user %s in group %s: %s",
+                    warning.user_id,
+                    settings.group_id,
+                    result,
+                    exc_info=result,
                 )
-                user = user_member.user
-                user_mention = get_user_mention(user)
-            except Exception:
-                # Fallback to user ID if we can't get user info
-                user_mention = f"User {warning.user_id}"
-
-            # Send notification to warning topic
-            threshold_display = format_threshold_display(
-                settings.warning_time_threshold_minutes
-            )
-            restriction_message = RESTRICTION_MESSAGE_AFTER_TIME.format(
-                user_mention=user_mention,
-                threshold_display=threshold_display,
-                rules_link=settings.rules_link,
-                dm_link=dm_link,
-            )
-            await bot.send_message(
-                chat_id=settings.group_id,
-                message_thread_id=settings.warning_topic_id,
-                text=restriction_message,
-                parse_mode="Markdown",
-            )
-
-            logger.info(
-                f"Auto-restricted user {warning.user_id} after {settings.warning_time_threshold_minutes} minutes (group_id={settings.group_id})"
-            )
-        except Exception as e:
-            logger.error(
-                f"Error auto-restricting user {warning.user_id} in group {settings.group_id}: {e}", exc_info=True
-            )
@@ -8,7 +8,9 @@ Telegram's API across different handlers and services.
 from telegram import Bot, User
 from telegram.constants import ChatMemberStatus
 from telegram.error import BadRequest, Forbidden
-from telegram.helpers import mention_markdown
+from telegram.helpers import mention_html
+
+from bot.services.bot_info import GroupPermissionsCache
 
 
 def get_user_mention(user: User) -> str:
@@ -16,24 +18,24 @@ def get_user_mention(user: User) -> str:
     Get a formatted mention string for a user.
 
     Returns `@username` if the user has a username, otherwise returns
-    a markdown mention using the user's full name and ID.
+    an HTML mention using the user's full name and ID.
 
     Args:
         user: Telegram User object.
 
     Returns:
-        str: Formatted user mention (either @username or markdown mention).
+        str: Formatted user mention (either @username or HTML mention).
     """
     return (
         f"@{user.username}"
         if user.username
-        else mention_markdown(user.id, user.full_name, version=2)
+        else mention_html(user.id, user.full_name)
     )
 
 
 def get_user_mention_by_id(user_id: int, user_full_name: str) -> str:
     """
-    Get a formatted markdown mention for a user by ID and name.
+    Get a formatted HTML mention for a user by ID and name.
 
     Used when only user ID and full name are available (not a full User object).
 
@@ -42,9 +44,9 @@ def get_user_mention_by_id(user_id: int, user_full_name: str) -> str:
         user_full_name: User's full name.
 
     Returns:
-        str: Markdown mention string.
+        str: HTML mention string.
     """
-    return mention_markdown(user_id, user_full_name, version=2)
+    return mention_html(user_id, user_full_name)
 
 
 async def get_user_status(
@@ -93,9 +95,8 @@ async def unrestrict_user(
     Raises:
         BadRequest: If user not found or bot lacks permissions.
     """
-    # Get group's default permissions
-    chat = await bot.get_chat(group_id)
-    default_permissions = chat.permissions
+    # Get group's default permissions (cached to avoid repeated API calls)
+    default_permissions = await GroupPermissionsCache.get_permissions(bot, group_id)
     
     # Apply default permissions to remove restrictions
     await bot.restrict_chat_member(
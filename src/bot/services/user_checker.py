@@ -5,7 +5,9 @@ This module provides utilities for checking if a Telegram user has
 a complete profile (public photo and username set).
 """
 
+import time
 from dataclasses import dataclass
+from typing import ClassVar
 
 from telegram import Bot, User
 
@@ -50,7 +52,86 @@ class ProfileCheckResult:
         return missing
 
 
-async def check_user_profile(bot: Bot, user: User) -> ProfileCheckResult:
+class ProfilePhotoCache:
+    """
+    Cache for profile photo check results.
+
+    Remembers per user whether they have a profile photo (or are
+    whitelisted) for TTL_SECONDS, so repeated group messages from the same
+    user don't each cost a get_user_profile_photos() call.
+
+    Usage:
+        has_photo = ProfilePhotoCache.get(user_id)  # None if not cached
+        ProfilePhotoCache.set(user_id, has_photo)
+    """
+
+    # Seconds before a cached photo check result is refreshed
+    TTL_SECONDS = 300
+
+    # Maximum number of users kept; the oldest entries are evicted first
+    MAX_ENTRIES = 10_000
+
+    # Class-level cache: user_id -> (has_profile_photo, expires_at)
+    _entries: ClassVar[dict[int, tuple[bool, float]]] = {}
+
+    @classmethod
+    def get(cls, user_id: int) -> bool | None:
+        """
+        Get cached photo check result for a user.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            bool | None: Cached result, or None if missing or expired.
+        """
+        entry = cls._entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    @classmethod
+    def set(cls, user_id: int, has_profile_photo: bool) -> None:
+        """
+        Store photo check result for a user.
+
+        Entries are kept in insertion order, so re-inserting moves the user
+        to the end and the oldest entries are dropped once MAX_ENTRIES is
+        exceeded.
+
+        Args:
+            user_id: Telegram user ID.
+            has_profile_photo: Whether the user has a photo or is whitelisted.
+        """
+        cls._entries.pop(user_id, None)
+        while len(cls._entries) >= cls.MAX_ENTRIES:
+            del cls._entries[next(iter(cls._entries))]
+        cls._entries[user_id] = (
+            has_profile_photo,
+            time.monotonic() + cls.TTL_SECONDS,
+        )
+
+    @classmethod
+    def invalidate(cls, user_id: int) -> None:
+        """
+        Drop the cached result for a user (e.g., after whitelist changes).
+
+        Args:
+            user_id: Telegram user ID.
+        """
+        cls._entries.pop(user_id, None)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clear all cached results (primarily for testing).
+        """
+        cls._entries = {}
+
+
+async def check_user_profile(
+    bot: Bot, user: User, use_cache: bool = False
+) -> ProfileCheckResult:
     """
     Check if a user's profile is complete.
 
@@ -60,23 +141,28 @@ async def check_user_profile(bot: Bot, user: User) -> ProfileCheckResult:
 
     Note: Profile photos are fetched via API as they're not included
     in the User object. This makes one API call per check unless user
-    is in the whitelist.
+    is in the whitelist, or use_cache is set and a recent result is cached.
 
     Args:
         bot: Telegram bot instance for API calls.
         user: User object to check.
+        use_cache: Reuse a recent photo check result from ProfilePhotoCache.
+            Fresh results are always stored in the cache.
 
     Returns:
         ProfileCheckResult: Result containing photo and username status.
     """
     has_username = user.username is not None
 
-    db = get_database()
-    if db.is_user_photo_whitelisted(user.id):
-        has_profile_photo = True
-    else:
-        photos = await bot.get_user_profile_photos(user.id, limit=1)
-        has_profile_photo = photos.total_count > 0
+    has_profile_photo = ProfilePhotoCache.get(user.id) if use_cache else None
+    if has_profile_photo is None:
+        db = get_database()
+        if db.is_user_photo_whitelisted(user.id):
+            has_profile_photo = True
+        else:
+            photos = await bot.get_user_profile_photos(user.id, limit=1)
+            has_profile_photo = photos.total_count > 0
+        ProfilePhotoCache.set(user.id, has_profile_photo)
 
     return ProfileCheckResult(
         has_profile_photo=has_profile_photo,
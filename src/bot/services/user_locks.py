@@ -0,0 +1,38 @@
+"""
+Per-user locks for the PythonID bot.
+
+Updates are processed concurrently, so two updates about the same user
+(e.g. the chat_member update and the join message for one join) can run
+their check-then-act logic at the same time. Handlers serialize that
+logic per (group, user) with the locks provided here.
+"""
+
+import asyncio
+from weakref import WeakValueDictionary
+
+# Locks are only kept alive while a handler holds or waits on them, so the
+# mapping doesn't grow with every user ever seen
+_locks: WeakValueDictionary[tuple[int, int], asyncio.Lock] = WeakValueDictionary()
+
+
+def get_user_lock(group_id: int, user_id: int) -> asyncio.Lock:
+    """
+    Get the lock serializing work for a user in a group.
+
+    Usage:
+        async with get_user_lock(group_id, user_id):
+            ...
+
+    Args:
+        group_id: Telegram group ID.
+        user_id: Telegram user ID.
+
+    Returns:
+        asyncio.Lock: Lock shared by all callers for the same (group, user).
+    """
+    key = (group_id, user_id)
+    lock = _locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _locks[key] = lock
+    return lock
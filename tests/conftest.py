@@ -0,0 +1,22 @@
+import pytest
+
+from bot.database.service import init_database, reset_database
+from bot.services.bot_info import GroupPermissionsCache
+from bot.services.user_checker import ProfilePhotoCache
+
+
+@pytest.fixture(autouse=True)
+def reset_service_caches():
+    GroupPermissionsCache.reset()
+    ProfilePhotoCache.reset()
+    yield
+    GroupPermissionsCache.reset()
+    ProfilePhotoCache.reset()
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_database(str(db_path))
+    yield db_path
+    reset_database()
@@ -2,7 +2,7 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from bot.services.bot_info import BotInfoCache
+from bot.services.bot_info import BotInfoCache, GroupPermissionsCache
 
 
 @pytest.fixture(autouse=True)
@@ -47,3 +47,35 @@ class TestBotInfoCache:
         await BotInfoCache.get_username(bot)
 
         assert bot.get_me.call_count == 2
+
+
+class TestGroupPermissionsCache:
+    async def test_fetches_permissions_on_first_call(self):
+        bot = AsyncMock()
+        chat = MagicMock()
+        bot.get_chat.return_value = chat
+
+        permissions = await GroupPermissionsCache.get_permissions(bot, -100123)
+
+        assert permissions is chat.permissions
+        bot.get_chat.assert_called_once_with(-100123)
+
+    async def test_caches_permissions_per_group(self):
+        bot = AsyncMock()
+        bot.get_chat.return_value = MagicMock()
+
+        await GroupPermissionsCache.get_permissions(bot, -100123)
+        await GroupPermissionsCache.get_permissions(bot, -100123)
+        await GroupPermissionsCache.get_permissions(bot, -100456)
+
+        assert bot.get_chat.call_count == 2
+
+    async def test_refetches_after_ttl(self, monkeypatch):
+        bot = AsyncMock()
+        bot.get_chat.return_value = MagicMock()
+        monkeypatch.setattr(GroupPermissionsCache, "TTL_SECONDS", 0)
+
+        await GroupPermissionsCache.get_permissions(bot, -100123)
+        await GroupPermissionsCache.get_permissions(bot, -100123)
+
+        assert bot.get_chat.call_count == 2
@@ -1,11 +1,9 @@
-import tempfile
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from bot.database.service import init_database, reset_database
 from bot.handlers.captcha import (
+    CaptchaJobData,
     captcha_callback_handler,
     captcha_timeout_callback,
     chat_member_handler,
@@ -56,15 +54,6 @@ def mock_update_new_member(mock_new_member):
     return update
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 class TestNewMemberHandler:
     async def test_new_member_restricts_user(
         self, mock_update_new_member, mock_context, mock_settings, temp_db
@@ -135,7 +124,7 @@ class TestNewMemberHandler:
         call_args = mock_context.job_queue.run_once.call_args
         assert call_args.kwargs["when"] == 300
         assert call_args.kwargs["name"] == "captcha_timeout_-1001234567890_12345"
-        assert call_args.kwargs["data"]["user_id"] == 12345
+        assert call_args.kwargs["data"].user_id == 12345
 
     async def test_captcha_disabled_skips_check(
         self, mock_update_new_member, mock_context, mock_settings, temp_db
@@ -192,14 +181,52 @@ class TestNewMemberHandler:
     async def test_restrict_failure_continues_gracefully(
         self, mock_update_new_member, mock_context, mock_settings, temp_db
     ):
+        from bot.database.service import get_database
+
         mock_context.bot.restrict_chat_member.side_effect = Exception(
             "Restriction failed"
         )
+        sent_message = MagicMock()
+        sent_message.chat_id = -1001234567890
+        sent_message.message_id = 999
+        mock_context.bot.send_message.return_value = sent_message
 
         with patch("bot.handlers.captcha.get_settings", return_value=mock_settings):
             await new_member_handler(mock_update_new_member, mock_context)
 
-        mock_context.bot.send_message.assert_not_called()
+        mock_context.bot.delete_message.assert_called_once_with(
+            chat_id=-1001234567890, message_id=999
+        )
+        mock_context.job_queue.run_once.assert_not_called()
+        assert get_database().get_pending_captcha(12345, -1001234567890) is None
+
+    async def test_multiple_members_challenged_despite_one_failure(
+        self, mock_update_new_member, mock_context, mock_settings, temp_db
+    ):
+        from bot.database.service import get_database
+
+        second_member = MagicMock()
+        second_member.id = 67890
+        second_member.is_bot = False
+        second_member.full_name = "Second User"
+        mock_update_new_member.message.new_chat_members.append(second_member)
+
+        sent_message = MagicMock()
+        sent_message.chat_id = -1001234567890
+        sent_message.message_id = 999
+        mock_context.bot.send_message.side_effect = [
+            Exception("Send failed"),
+            sent_message,
+        ]
+
+        with patch("bot.handlers.captcha.get_settings", return_value=mock_settings):
+            await new_member_handler(mock_update_new_member, mock_context)
+
+        assert mock_context.bot.restrict_chat_member.call_count == 2
+        assert mock_context.bot.send_message.call_count == 2
+        db = get_database()
+        pending_ids = {p.user_id for p in db.get_all_pending_captchas()}
+        assert len(pending_ids) == 1
 
     async def test_duplicate_prevention_new_member_handler(
         self, mock_update_new_member, mock_context, mock_settings, temp_db
@@ -484,13 +511,13 @@ class TestCaptchaTimeoutCallback:
         db.add_pending_captcha(12345, -1001234567890, -1001234567890, 999, "Test User")
 
         job = MagicMock()
-        job.data = {
-            "user_id": 12345,
-            "group_id": -1001234567890,
-            "chat_id": -1001234567890,
-            "message_id": 999,
-            "user_full_name": "Test User",
-        }
+        job.data = CaptchaJobData(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
         mock_context.job = job
 
         await captcha_timeout_callback(mock_context)
@@ -504,13 +531,13 @@ class TestCaptchaTimeoutCallback:
         db.add_pending_captcha(12345, -1001234567890, -1001234567890, 999, "Test User")
 
         job = MagicMock()
-        job.data = {
-            "user_id": 12345,
-            "group_id": -1001234567890,
-            "chat_id": -1001234567890,
-            "message_id": 999,
-            "user_full_name": "Test User",
-        }
+        job.data = CaptchaJobData(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
         mock_context.job = job
 
         await captcha_timeout_callback(mock_context)
@@ -524,13 +551,13 @@ class TestCaptchaTimeoutCallback:
         db.add_pending_captcha(12345, -1001234567890, -1001234567890, 999, "Test User")
 
         job = MagicMock()
-        job.data = {
-            "user_id": 12345,
-            "group_id": -1001234567890,
-            "chat_id": -1001234567890,
-            "message_id": 999,
-            "user_full_name": "Test User",
-        }
+        job.data = CaptchaJobData(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
         mock_context.job = job
 
         await captcha_timeout_callback(mock_context)
@@ -543,13 +570,13 @@ class TestCaptchaTimeoutCallback:
 
     async def test_already_verified_skips_actions(self, mock_context, temp_db):
         job = MagicMock()
-        job.data = {
-            "user_id": 12345,
-            "group_id": -1001234567890,
-            "chat_id": -1001234567890,
-            "message_id": 999,
-            "user_full_name": "Test User",
-        }
+        job.data = CaptchaJobData(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
         mock_context.job = job
 
         await captcha_timeout_callback(mock_context)
@@ -583,13 +610,13 @@ class TestCaptchaTimeoutCallback:
         mock_context.bot.edit_message_text.side_effect = Exception("Edit failed")
 
         job = MagicMock()
-        job.data = {
-            "user_id": 12345,
-            "group_id": -1001234567890,
-            "chat_id": -1001234567890,
-            "message_id": 999,
-            "user_full_name": "Test User",
-        }
+        job.data = CaptchaJobData(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
         mock_context.job = job
 
         await captcha_timeout_callback(mock_context)
@@ -734,6 +761,10 @@ class TestChatMemberHandler:
         
         # Should handle gracefully and not schedule timeout job
         mock_context.job_queue.run_once.assert_not_called()
+        # The duplicate challenge message should be removed
+        mock_context.bot.delete_message.assert_called_once_with(
+            chat_id=-1001234567890, message_id=999
+        )
 
     async def test_bot_member_skipped_in_chat_member(
         self, mock_context, mock_settings, temp_db
@@ -790,3 +821,36 @@ class TestChatMemberHandler:
             await chat_member_handler(update, mock_context)
         
         mock_context.bot.restrict_chat_member.assert_not_called()
+
+    async def test_concurrent_join_updates_challenge_once(
+        self, mock_context, mock_update_new_member, mock_settings, temp_db
+    ):
+        """Test the chat_member update and join message for one join challenge once."""
+        import asyncio
+
+        from telegram.constants import ChatMemberStatus
+
+        from bot.database.service import get_database
+
+        update = self.create_chat_member_update(ChatMemberStatus.LEFT, ChatMemberStatus.MEMBER)
+
+        sent_message = MagicMock()
+        sent_message.chat_id = -1001234567890
+        sent_message.message_id = 999
+
+        async def send_message(**kwargs):
+            # Yield so the other handler runs while this one awaits the API
+            await asyncio.sleep(0)
+            return sent_message
+
+        mock_context.bot.send_message.side_effect = send_message
+
+        with patch("bot.handlers.captcha.get_settings", return_value=mock_settings):
+            await asyncio.gather(
+                chat_member_handler(update, mock_context),
+                new_member_handler(mock_update_new_member, mock_context),
+            )
+
+        mock_context.bot.restrict_chat_member.assert_called_once()
+        mock_context.bot.send_message.assert_called_once()
+        assert get_database().get_pending_captcha(12345, -1001234567890) is not None
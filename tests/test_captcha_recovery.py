@@ -1,13 +1,11 @@
 import logging
-import tempfile
 from datetime import UTC, datetime, timedelta
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from sqlmodel import Session, text
 
-from bot.database.service import get_database, init_database, reset_database
+from bot.database.service import get_database
 from bot.services.captcha_recovery import (
     handle_captcha_expiration,
     recover_pending_captchas,
@@ -22,15 +20,6 @@ def mock_settings():
     return settings
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 @pytest.fixture
 def mock_bot():
     bot = AsyncMock()
@@ -71,7 +60,7 @@ class TestHandleCaptchaExpiration:
         call_args = mock_bot.edit_message_text.call_args
         assert call_args.kwargs["chat_id"] == -1001234567890
         assert call_args.kwargs["message_id"] == 999
-        assert call_args.kwargs["parse_mode"] == "Markdown"
+        assert call_args.kwargs["parse_mode"] == "HTML"
         assert "tidak menyelesaikan verifikasi" in call_args.kwargs["text"]
 
         assert db.get_pending_captcha(12345, -1001234567890) is None
@@ -199,11 +188,11 @@ class TestRecoverPendingCaptchas:
         assert call_args.args[0] == mock_callback
         assert 149 <= call_args.kwargs["when"] <= 151  # Allow 1 second tolerance
         assert call_args.kwargs["name"] == "captcha_timeout_-1001234567890_12345"
-        assert call_args.kwargs["data"]["user_id"] == 12345
-        assert call_args.kwargs["data"]["group_id"] == -1001234567890
-        assert call_args.kwargs["data"]["chat_id"] == -1001234567890
-        assert call_args.kwargs["data"]["message_id"] == 999
-        assert call_args.kwargs["data"]["user_full_name"] == "Test User"
+        assert call_args.kwargs["data"].user_id == 12345
+        assert call_args.kwargs["data"].group_id == -1001234567890
+        assert call_args.kwargs["data"].chat_id == -1001234567890
+        assert call_args.kwargs["data"].message_id == 999
+        assert call_args.kwargs["data"].user_full_name == "Test User"
 
         assert "Recovering 1 pending captcha verification(s)" in caplog.text
         assert "Rescheduling captcha timeout for user 12345" in caplog.text
@@ -278,9 +267,45 @@ class TestRecoverPendingCaptchas:
         # Should reschedule the second one
         mock_application.job_queue.run_once.assert_called_once()
         call_args = mock_application.job_queue.run_once.call_args
-        assert call_args.kwargs["data"]["user_id"] == 67890
+        assert call_args.kwargs["data"].user_id == 67890
 
         assert "Recovering 2 pending captcha verification(s)" in caplog.text
         assert "Expiring captcha for user 12345" in caplog.text
         assert "Rescheduling captcha timeout for user 67890" in caplog.text
         assert "Captcha recovery complete" in caplog.text
+
+    async def test_recover_pending_captchas_expiry_failure_does_not_stop_others(
+        self, mock_application, mock_settings, temp_db, caplog
+    ):
+        caplog.set_level(logging.INFO)
+        db = get_database()
+
+        old_time = datetime.now(UTC) - timedelta(seconds=400)
+        records = [
+            db.add_pending_captcha(user_id, -1001234567890, -1001234567890, 999, "User")
+            for user_id in (111, 222, 333)
+        ]
+
+        with Session(db._engine) as session:
+            stmt = text("UPDATE pending_validations SET created_at = :created_at WHERE id = :id")
+            for record in records:
+                session.execute(stmt, {"created_at": old_time, "id": record.id})
+            session.commit()
+
+        async def expire(**kwargs):
+            if kwargs["user_id"] == 222:
+                raise RuntimeError("Something went wrong")
+
+        with (
+            patch("bot.services.captcha_recovery.get_settings", return_value=mock_settings),
+            patch(
+                "bot.services.captcha_recovery.handle_captcha_expiration",
+                side_effect=expire,
+            ) as mock_expire,
+        ):
+            await recover_pending_captchas(mock_application)
+
+        expired_ids = sorted(call.kwargs["user_id"] for call in mock_expire.call_args_list)
+        assert expired_ids == [111, 222, 333]
+        assert "Failed to recover captcha for user 222: Something went wrong" in caplog.text
+        assert "Captcha recovery complete" in caplog.text
@@ -1,6 +1,7 @@
 import pytest
+from pydantic import ValidationError
 
-from bot.config import Settings, get_settings, get_env_file
+from bot.config import Settings, get_env_file, get_settings, reset_settings
 
 
 class TestGetEnvFile:
@@ -46,12 +47,46 @@ class TestSettings:
         assert settings.group_id == -1001234567890
         assert settings.warning_topic_id == 42
 
+    def test_webhook_disabled_by_default(self, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token_123")
+        monkeypatch.setenv("GROUP_ID", "-1001234567890")
+        monkeypatch.setenv("WARNING_TOPIC_ID", "42")
+        monkeypatch.delenv("WEBHOOK_URL", raising=False)
+        monkeypatch.delenv("WEBHOOK_PORT", raising=False)
+
+        settings = Settings(_env_file=None)
+
+        assert settings.webhook_url is None
+        assert settings.webhook_port == 8443
+
+    def test_webhook_settings_from_env(self, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token_123")
+        monkeypatch.setenv("GROUP_ID", "-1001234567890")
+        monkeypatch.setenv("WARNING_TOPIC_ID", "42")
+        monkeypatch.setenv("WEBHOOK_URL", "https://bot.example.com")
+        monkeypatch.setenv("WEBHOOK_PORT", "443")
+
+        settings = Settings(_env_file=None)
+
+        assert settings.webhook_url == "https://bot.example.com"
+        assert settings.webhook_port == 443
+
+    def test_settings_are_frozen(self, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token_123")
+        monkeypatch.setenv("GROUP_ID", "-1001234567890")
+        monkeypatch.setenv("WARNING_TOPIC_ID", "42")
+
+        settings = Settings(_env_file=None)
+
+        with pytest.raises(ValidationError):
+            settings.group_id = -100999
+
     def test_settings_missing_required_field(self, monkeypatch):
         monkeypatch.delenv("TELEGRAM_BOT_TOKEN", raising=False)
         monkeypatch.delenv("GROUP_ID", raising=False)
         monkeypatch.delenv("WARNING_TOPIC_ID", raising=False)
 
-        with pytest.raises(Exception):
+        with pytest.raises(ValidationError):
             Settings(_env_file=None)
 
     def test_get_settings_cached(self, monkeypatch):
@@ -59,9 +94,26 @@ class TestSettings:
         monkeypatch.setenv("GROUP_ID", "-100999")
         monkeypatch.setenv("WARNING_TOPIC_ID", "1")
 
-        get_settings.cache_clear()
+        reset_settings()
 
         settings1 = get_settings()
         settings2 = get_settings()
 
         assert settings1 is settings2
+        reset_settings()
+
+    def test_reset_settings_reloads_environment(self, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "first_token")
+        monkeypatch.setenv("GROUP_ID", "-100999")
+        monkeypatch.setenv("WARNING_TOPIC_ID", "1")
+
+        reset_settings()
+        first = get_settings()
+
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "second_token")
+        reset_settings()
+        second = get_settings()
+
+        assert first is not second
+        assert second.telegram_bot_token == "second_token"
+        reset_settings()
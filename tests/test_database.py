@@ -1,11 +1,13 @@
+import sqlite3
 import tempfile
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 
 from bot.database.models import UserWarning
 from bot.database.service import (
+    SCHEMA_VERSION,
     DatabaseService,
     get_database,
     init_database,
@@ -13,15 +15,6 @@ from bot.database.service import (
 )
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 @pytest.fixture
 def db_service(temp_db) -> DatabaseService:
     return get_database()
@@ -38,6 +31,81 @@ class TestDatabaseService:
             assert db_path.exists()
             reset_database()
 
+    def test_records_schema_version(self, temp_db):
+        with sqlite3.connect(temp_db) as connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+
+        assert version == SCHEMA_VERSION
+
+    def test_applies_connection_pragmas(self, db_service):
+        with db_service._engine.connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+
+        assert journal_mode == "wal"
+        assert busy_timeout == 5000
+
+    def test_reopens_existing_database(self, temp_db):
+        get_database().get_or_create_user_warning(user_id=123, group_id=-100999)
+        reset_database()
+
+        service = init_database(str(temp_db))
+        record = service.record_user_message(user_id=123, group_id=-100999)
+
+        assert record.message_count == 2
+
+    def test_migration_removes_duplicate_active_warnings(self, temp_db):
+        reset_database()
+        with sqlite3.connect(temp_db) as connection:
+            connection.execute("DROP INDEX ux_uw_active_user_group")
+            connection.executemany(
+                "INSERT INTO user_warnings (user_id, group_id, message_count,"
+                " first_warned_at, last_message_at, is_restricted, restricted_by_bot)"
+                " VALUES (?, -100999, ?, '2024-01-01 00:00:00',"
+                " '2024-01-01 00:00:00', ?, 0)",
+                [(123, 1, 0), (123, 2, 0), (123, 3, 1), (456, 1, 0)],
+            )
+            connection.execute("PRAGMA user_version = 0")
+
+        service = init_database(str(temp_db))
+
+        with sqlite3.connect(temp_db) as connection:
+            rows = connection.execute(
+                "SELECT user_id, message_count, is_restricted FROM user_warnings"
+                " ORDER BY id"
+            ).fetchall()
+        assert rows == [(123, 2, 0), (123, 3, 1), (456, 1, 0)]
+        record = service.get_or_create_user_warning(user_id=123, group_id=-100999)
+        assert record.message_count == 2
+
+
+class TestTimestamps:
+    def test_loaded_timestamps_are_utc(self, db_service):
+        db_service.add_pending_captcha(123, -100999, -100999, 555, "Test User")
+
+        record = db_service.get_pending_captcha(123, -100999)
+
+        assert record.created_at.tzinfo is UTC
+        assert datetime.now(UTC) - record.created_at < timedelta(minutes=1)
+
+    def test_non_utc_timestamps_are_stored_as_utc(self, db_service):
+        record = db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+        local_time = datetime(2024, 1, 1, 19, 0, tzinfo=timezone(timedelta(hours=7)))
+
+        from sqlmodel import Session, select
+
+        with Session(db_service._engine) as session:
+            db_record = session.get(UserWarning, record.id)
+            db_record.first_warned_at = local_time
+            session.add(db_record)
+            session.commit()
+
+            loaded = session.exec(
+                select(UserWarning.first_warned_at).where(UserWarning.id == record.id)
+            ).one()
+
+        assert loaded == datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+
 
 class TestGetOrCreateUserWarning:
     def test_creates_new_record(self, db_service):
@@ -55,6 +123,14 @@ class TestGetOrCreateUserWarning:
         assert record1.id == record2.id
         assert record2.message_count == 1
 
+    def test_returns_existing_record_with_current_count(self, db_service):
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+        db_service.record_user_message(user_id=123, group_id=-100999)
+
+        record = db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+
+        assert record.message_count == 2
+
     def test_different_users_get_different_records(self, db_service):
         record1 = db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
         record2 = db_service.get_or_create_user_warning(user_id=456, group_id=-100999)
@@ -71,26 +147,30 @@ class TestGetOrCreateUserWarning:
         assert record2.message_count == 1
 
 
-class TestIncrementMessageCount:
-    def test_increments_count(self, db_service):
-        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+class TestRecordUserMessage:
+    def test_creates_record_on_first_message(self, db_service):
+        record = db_service.record_user_message(user_id=123, group_id=-100999)
 
-        record = db_service.increment_message_count(user_id=123, group_id=-100999)
+        assert record.user_id == 123
+        assert record.message_count == 1
+        assert record.is_restricted is False
 
-        assert record.message_count == 2
+    def test_increments_existing_record(self, db_service):
+        first = db_service.record_user_message(user_id=123, group_id=-100999)
+        db_service.record_user_message(user_id=123, group_id=-100999)
+        record = db_service.record_user_message(user_id=123, group_id=-100999)
 
-    def test_increments_multiple_times(self, db_service):
-        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+        assert record.id == first.id
+        assert record.message_count == 3
 
-        db_service.increment_message_count(user_id=123, group_id=-100999)
-        db_service.increment_message_count(user_id=123, group_id=-100999)
-        record = db_service.increment_message_count(user_id=123, group_id=-100999)
+    def test_starts_new_record_after_restriction(self, db_service):
+        first = db_service.record_user_message(user_id=123, group_id=-100999)
+        db_service.mark_user_restricted(user_id=123, group_id=-100999)
 
-        assert record.message_count == 4
+        record = db_service.record_user_message(user_id=123, group_id=-100999)
 
-    def test_raises_error_if_no_record(self, db_service):
-        with pytest.raises(ValueError):
-            db_service.increment_message_count(user_id=999, group_id=-100999)
+        assert record.id != first.id
+        assert record.message_count == 1
 
 
 class TestMarkUserRestricted:
@@ -120,6 +200,28 @@ class TestMarkUserRestricted:
         assert record.restricted_by_bot is True
 
 
+class TestMarkUsersRestricted:
+    def test_marks_all_users_in_one_call(self, db_service):
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+        db_service.get_or_create_user_warning(user_id=456, group_id=-100999)
+
+        records = db_service.mark_users_restricted([123, 456], group_id=-100999)
+
+        assert {record.user_id for record in records} == {123, 456}
+        assert all(record.is_restricted for record in records)
+        assert all(record.restricted_by_bot for record in records)
+
+    def test_skips_users_without_active_warning(self, db_service):
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+
+        records = db_service.mark_users_restricted([123, 999], group_id=-100999)
+
+        assert [record.user_id for record in records] == [123]
+
+    def test_empty_list_returns_empty(self, db_service):
+        assert db_service.mark_users_restricted([], group_id=-100999) == []
+
+
 class TestIsUserRestrictedByBot:
     def test_returns_true_for_bot_restricted_user(self, db_service):
         db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
@@ -210,7 +312,7 @@ class TestDeleteUserWarnings:
     def test_delete_user_warnings(self, db_service):
         # Create multiple warnings for same user
         db_service.get_or_create_user_warning(user_id=12345, group_id=-100111)
-        db_service.increment_message_count(user_id=12345, group_id=-100111)
+        db_service.record_user_message(user_id=12345, group_id=-100111)
         db_service.mark_user_restricted(user_id=12345, group_id=-100111)
 
         # Verify warning exists
@@ -226,6 +328,75 @@ class TestDeleteUserWarnings:
         deleted_count = db_service.delete_user_warnings(user_id=99999, group_id=-100111)
         assert deleted_count == 0
 
+    def test_delete_users_warnings_batch(self, db_service):
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100111)
+        db_service.get_or_create_user_warning(user_id=456, group_id=-100111)
+        db_service.get_or_create_user_warning(user_id=789, group_id=-100111)
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100222)
+
+        deleted_count = db_service.delete_users_warnings([123, 456], group_id=-100111)
+
+        assert deleted_count == 2
+        remaining = db_service.get_warnings_past_time_threshold(0)
+        assert {(w.user_id, w.group_id) for w in remaining} == {
+            (789, -100111),
+            (123, -100222),
+        }
+
+    def test_delete_users_warnings_empty_list(self, db_service):
+        assert db_service.delete_users_warnings([], group_id=-100111) == 0
+
+
+class TestVerifyUser:
+    def test_whitelists_and_deletes_warnings(self, db_service):
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+
+        deleted_count = db_service.verify_user(
+            user_id=123, verified_by_admin_id=999, group_id=-100999
+        )
+
+        assert deleted_count == 1
+        assert db_service.is_user_photo_whitelisted(123) is True
+        assert db_service.is_user_restricted_by_bot(123, -100999) is False
+
+    def test_returns_zero_without_warnings(self, db_service):
+        deleted_count = db_service.verify_user(
+            user_id=123, verified_by_admin_id=999, group_id=-100999
+        )
+
+        assert deleted_count == 0
+        assert db_service.is_user_photo_whitelisted(123) is True
+
+    def test_already_whitelisted_keeps_warnings(self, db_service):
+        db_service.add_photo_verification_whitelist(user_id=123, verified_by_admin_id=999)
+        db_service.get_or_create_user_warning(user_id=123, group_id=-100999)
+
+        with pytest.raises(ValueError, match="already whitelisted"):
+            db_service.verify_user(user_id=123, verified_by_admin_id=999, group_id=-100999)
+
+        assert db_service.delete_user_warnings(user_id=123, group_id=-100999) == 1
+
+
+class TestPopPendingCaptcha:
+    def test_returns_and_removes_record(self, db_service):
+        db_service.add_pending_captcha(123, -100999, -100999, 555, "Test User")
+
+        record = db_service.pop_pending_captcha(user_id=123, group_id=-100999)
+
+        assert record.user_id == 123
+        assert record.message_id == 555
+        assert db_service.get_pending_captcha(123, -100999) is None
+
+    def test_returns_none_if_no_record(self, db_service):
+        assert db_service.pop_pending_captcha(user_id=999, group_id=-100999) is None
+
+    def test_second_pop_returns_none(self, db_service):
+        db_service.add_pending_captcha(123, -100999, -100999, 555, "Test User")
+
+        db_service.pop_pending_captcha(user_id=123, group_id=-100999)
+
+        assert db_service.pop_pending_captcha(user_id=123, group_id=-100999) is None
+
 
 class TestModuleLevelFunctions:
     def test_get_database_raises_error_before_init(self):
@@ -1,11 +1,8 @@
-import tempfile
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from telegram.error import BadRequest
 
-from bot.database.service import init_database, reset_database
 from bot.handlers.dm import handle_dm
 from bot.services.user_checker import ProfileCheckResult
 
@@ -43,15 +40,6 @@ def mock_context():
     return context
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 class TestHandleDM:
     async def test_no_message(self, mock_context):
         update = MagicMock()
@@ -182,8 +170,8 @@ class TestHandleDM:
 
         db = get_database()
         db.get_or_create_user_warning(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
         db.mark_user_restricted(12345, -1001234567890)
 
         user_member = MagicMock()
@@ -226,8 +214,8 @@ class TestHandleDM:
 
         db = get_database()
         db.get_or_create_user_warning(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
         db.mark_user_restricted(12345, -1001234567890)
 
         user_member = MagicMock()
@@ -342,6 +330,36 @@ class TestHandleDM:
         assert "⏳" in reply_args.args[0]
         assert "verifikasi captcha yang tertunda" in reply_args.args[0]
 
+    async def test_pending_captcha_ignored_when_captcha_disabled(
+        self, mock_update, mock_context, mock_settings, temp_db
+    ):
+        from bot.database.service import get_database
+
+        db = get_database()
+        db.add_pending_captcha(
+            user_id=12345,
+            group_id=-1001234567890,
+            chat_id=-1001234567890,
+            message_id=999,
+            user_full_name="Test User",
+        )
+        mock_settings.captcha_enabled = False
+        complete_result = ProfileCheckResult(
+            has_profile_photo=True, has_username=True
+        )
+
+        with (
+            patch("bot.handlers.dm.get_settings", return_value=mock_settings),
+            patch(
+                "bot.handlers.dm.check_user_profile",
+                return_value=complete_result,
+            ),
+        ):
+            await handle_dm(mock_update, mock_context)
+
+        reply_args = mock_update.message.reply_text.call_args
+        assert "tidak memiliki pembatasan dari bot" in reply_args.args[0]
+
 
 class TestDatabaseIsUserRestrictedByBot:
     def test_returns_false_when_no_record(self, temp_db):
@@ -362,7 +380,7 @@ class TestDatabaseIsUserRestrictedByBot:
 
         db = get_database()
         db.get_or_create_user_warning(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
-        db.increment_message_count(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
+        db.record_user_message(12345, -1001234567890)
         db.mark_user_restricted(12345, -1001234567890)
         assert db.is_user_restricted_by_bot(12345, -1001234567890) is True
@@ -1,24 +1,40 @@
-import tempfile
-from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from bot.database.service import init_database, reset_database
 from bot.handlers.message import handle_message
 from bot.services.user_checker import ProfileCheckResult
 
+COMPLETE_PROFILE = ProfileCheckResult(has_profile_photo=True, has_username=True)
+MISSING_PHOTO = ProfileCheckResult(has_profile_photo=False, has_username=True)
+MISSING_USERNAME = ProfileCheckResult(has_profile_photo=True, has_username=False)
+MISSING_BOTH = ProfileCheckResult(has_profile_photo=False, has_username=False)
+
 
 @pytest.fixture
 def mock_settings():
-    settings = MagicMock()
-    settings.group_id = -1001234567890
-    settings.warning_topic_id = 42
-    settings.restrict_failed_users = False
-    settings.warning_time_threshold_minutes = 180
-    settings.warning_threshold = 3
-    settings.rules_link = "https://example.com/rules"
-    return settings
+    return SimpleNamespace(
+        group_id=-1001234567890,
+        warning_topic_id=42,
+        restrict_failed_users=False,
+        warning_time_threshold_minutes=180,
+        warning_threshold=3,
+        rules_link="https://example.com/rules",
+    )
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch, mock_settings):
+    monkeypatch.setattr("bot.handlers.message.get_settings", lambda: mock_settings)
+
+
+@pytest.fixture(autouse=True)
+def mock_check_user_profile(monkeypatch):
+    check = AsyncMock(return_value=COMPLETE_PROFILE)
+    monkeypatch.setattr("bot.handlers.message.check_user_profile", check)
+    return check
 
 
 @pytest.fixture
@@ -42,15 +58,6 @@ def mock_context():
     return context
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 class TestHandleMessage:
     async def test_no_message(self, mock_context):
         update = MagicMock()
@@ -69,155 +76,78 @@ class TestHandleMessage:
 
         mock_context.bot.send_message.assert_not_called()
 
-    async def test_wrong_group(self, mock_update, mock_context, mock_settings):
+    async def test_wrong_group(self, mock_update, mock_context):
         mock_update.effective_chat.id = -100999999  # Different group
 
-        with patch("bot.handlers.message.get_settings", return_value=mock_settings):
-            await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.send_message.assert_not_called()
 
-    async def test_bot_user_ignored(self, mock_update, mock_context, mock_settings):
+    async def test_bot_user_ignored(self, mock_update, mock_context):
         mock_update.message.from_user.is_bot = True
 
-        with patch("bot.handlers.message.get_settings", return_value=mock_settings):
-            await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.send_message.assert_not_called()
 
     async def test_complete_profile_no_warning(
-        self, mock_update, mock_context, mock_settings
+        self, mock_update, mock_context, mock_check_user_profile
     ):
-        complete_result = ProfileCheckResult(has_profile_photo=True, has_username=True)
-
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=complete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
+        # mock_check_user_profile reports a complete profile by default
+        await handle_message(mock_update, mock_context)
 
+        mock_check_user_profile.assert_awaited_once()
         mock_context.bot.send_message.assert_not_called()
 
-    async def test_missing_photo_sends_warning(
-        self, mock_update, mock_context, mock_settings
+    @pytest.mark.parametrize(
+        ("username", "profile_result", "expected_texts"),
+        [
+            ("testuser", MISSING_PHOTO, ["foto profil publik"]),
+            (None, MISSING_USERNAME, ["username", "Test User"]),
+            (None, MISSING_BOTH, ["foto profil publik", "username"]),
+            ("cooluser", MISSING_PHOTO, ["@cooluser"]),
+        ],
+        ids=[
+            "missing_photo",
+            "missing_username",
+            "missing_both",
+            "mentions_username",
+        ],
+    )
+    async def test_incomplete_profile_sends_warning(
+        self,
+        mock_update,
+        mock_context,
+        mock_check_user_profile,
+        username,
+        profile_result,
+        expected_texts,
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_update.message.from_user.username = username
+        mock_check_user_profile.return_value = profile_result
 
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.send_message.assert_called_once()
         call_args = mock_context.bot.send_message.call_args
         assert call_args.kwargs["chat_id"] == -1001234567890
         assert call_args.kwargs["message_thread_id"] == 42
-        assert "foto profil publik" in call_args.kwargs["text"]
-
-    async def test_missing_username_sends_warning(
-        self, mock_update, mock_context, mock_settings
-    ):
-        mock_update.message.from_user.username = None
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=True, has_username=False
-        )
-
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
-
-        mock_context.bot.send_message.assert_called_once()
-        call_args = mock_context.bot.send_message.call_args
-        assert "username" in call_args.kwargs["text"]
-        assert "Test User" in call_args.kwargs["text"]
-
-    async def test_missing_both_sends_warning(
-        self, mock_update, mock_context, mock_settings
-    ):
-        mock_update.message.from_user.username = None
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=False
-        )
-
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
-
-        mock_context.bot.send_message.assert_called_once()
-        call_args = mock_context.bot.send_message.call_args
-        assert "foto profil publik" in call_args.kwargs["text"]
-        assert "username" in call_args.kwargs["text"]
-
-    async def test_warning_mentions_username_when_available(
-        self, mock_update, mock_context, mock_settings
-    ):
-        mock_update.message.from_user.username = "cooluser"
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
-
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
-
-        call_args = mock_context.bot.send_message.call_args
-        assert "@cooluser" in call_args.kwargs["text"]
+        for expected in expected_texts:
+            assert expected in call_args.kwargs["text"]
 
 
 class TestHandleMessageWithProgressiveRestriction:
     @pytest.fixture
-    def mock_settings_with_restriction(self):
-        settings = MagicMock()
-        settings.group_id = -1001234567890
-        settings.warning_topic_id = 42
-        settings.restrict_failed_users = True
-        settings.warning_threshold = 3
-        settings.warning_time_threshold_minutes = 180
-        settings.rules_link = "https://example.com/rules"
-        return settings
+    def mock_settings(self, mock_settings):
+        mock_settings.restrict_failed_users = True
+        return mock_settings
 
     async def test_first_message_sends_warning(
-        self, mock_update, mock_context, mock_settings_with_restriction, temp_db
+        self, mock_update, mock_context, mock_check_user_profile, temp_db
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_check_user_profile.return_value = MISSING_PHOTO
 
-        with (
-            patch(
-                "bot.handlers.message.get_settings",
-                return_value=mock_settings_with_restriction,
-            ),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.send_message.assert_called_once()
         call_args = mock_context.bot.send_message.call_args
@@ -226,52 +156,28 @@ class TestHandleMessageWithProgressiveRestriction:
         mock_context.bot.restrict_chat_member.assert_not_called()
 
     async def test_second_message_silent(
-        self, mock_update, mock_context, mock_settings_with_restriction, temp_db
+        self, mock_update, mock_context, mock_check_user_profile, temp_db
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_check_user_profile.return_value = MISSING_PHOTO
 
-        with (
-            patch(
-                "bot.handlers.message.get_settings",
-                return_value=mock_settings_with_restriction,
-            ),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            # First message - warning
-            await handle_message(mock_update, mock_context)
-            mock_context.bot.send_message.reset_mock()
+        # First message - warning
+        await handle_message(mock_update, mock_context)
+        mock_context.bot.send_message.reset_mock()
 
-            # Second message - silent
-            await handle_message(mock_update, mock_context)
+        # Second message - silent
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.send_message.assert_not_called()
         mock_context.bot.restrict_chat_member.assert_not_called()
 
     async def test_threshold_message_restricts_user(
-        self, mock_update, mock_context, mock_settings_with_restriction, temp_db
+        self, mock_update, mock_context, mock_check_user_profile, temp_db
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_check_user_profile.return_value = MISSING_PHOTO
 
-        with (
-            patch(
-                "bot.handlers.message.get_settings",
-                return_value=mock_settings_with_restriction,
-            ),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            # Messages 1, 2, 3
-            for _ in range(3):
-                await handle_message(mock_update, mock_context)
+        # Messages 1, 2, 3
+        for _ in range(3):
+            await handle_message(mock_update, mock_context)
 
         mock_context.bot.restrict_chat_member.assert_called_once()
         restrict_args = mock_context.bot.restrict_chat_member.call_args
@@ -284,52 +190,50 @@ class TestHandleMessageWithProgressiveRestriction:
         assert "dibatasi" in call_args.kwargs["text"]
 
     async def test_no_restriction_when_disabled(
-        self, mock_update, mock_context, mock_settings
+        self, mock_update, mock_context, mock_settings, mock_check_user_profile
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_settings.restrict_failed_users = False
+        mock_check_user_profile.return_value = MISSING_PHOTO
 
-        with (
-            patch("bot.handlers.message.get_settings", return_value=mock_settings),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
         mock_context.bot.restrict_chat_member.assert_not_called()
         call_args = mock_context.bot.send_message.call_args
         assert "⚠️" in call_args.kwargs["text"]
 
     async def test_different_users_tracked_separately(
-        self, mock_update, mock_context, mock_settings_with_restriction, temp_db
+        self, mock_update, mock_context, mock_check_user_profile, temp_db
     ):
-        incomplete_result = ProfileCheckResult(
-            has_profile_photo=False, has_username=True
-        )
+        mock_check_user_profile.return_value = MISSING_PHOTO
 
-        with (
-            patch(
-                "bot.handlers.message.get_settings",
-                return_value=mock_settings_with_restriction,
-            ),
-            patch(
-                "bot.handlers.message.check_user_profile",
-                return_value=incomplete_result,
-            ),
-        ):
-            # User 1 - 2 messages
-            mock_update.message.from_user.id = 111
-            await handle_message(mock_update, mock_context)
-            await handle_message(mock_update, mock_context)
+        # User 1 - 2 messages
+        mock_update.message.from_user.id = 111
+        await handle_message(mock_update, mock_context)
+        await handle_message(mock_update, mock_context)
 
-            # User 2 - 1 message (should get warning)
-            mock_update.message.from_user.id = 222
-            mock_context.bot.send_message.reset_mock()
-            await handle_message(mock_update, mock_context)
+        # User 2 - 1 message (should get warning)
+        mock_update.message.from_user.id = 222
+        mock_context.bot.send_message.reset_mock()
+        await handle_message(mock_update, mock_context)
 
         # User 2 should have received first warning
         mock_context.bot.send_message.assert_called_once()
         assert "⚠️" in mock_context.bot.send_message.call_args.kwargs["text"]
+
+    async def test_concurrent_messages_restrict_once(
+        self, mock_update, mock_context, mock_check_user_profile, temp_db
+    ):
+        mock_check_user_profile.return_value = MISSING_PHOTO
+
+        async def restrict_chat_member(**kwargs):
+            # Yield so the other messages are handled while this one awaits
+            await asyncio.sleep(0)
+
+        mock_context.bot.restrict_chat_member.side_effect = restrict_chat_member
+
+        # Messages 3 and 4 both reach the threshold if not serialized
+        await asyncio.gather(
+            *(handle_message(mock_update, mock_context) for _ in range(4))
+        )
+
+        mock_context.bot.restrict_chat_member.assert_called_once()
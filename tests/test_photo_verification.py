@@ -1,20 +1,9 @@
-import tempfile
-from pathlib import Path
 
 import pytest
 
 from bot.database.service import get_database, init_database, reset_database
 
 
-@pytest.fixture
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
-
-
 @pytest.fixture
 def db_service(temp_db):
     return get_database()
@@ -102,3 +91,24 @@ class TestPhotoVerificationWhitelist:
             user_id=12345, verified_by_admin_id=88888
         )
         assert db_service.is_user_photo_whitelisted(12345) is True
+
+    def test_whitelist_changes_after_first_lookup_are_seen(self, db_service):
+        assert db_service.is_user_photo_whitelisted(12345) is False
+
+        db_service.add_photo_verification_whitelist(
+            user_id=12345, verified_by_admin_id=99999
+        )
+        assert db_service.is_user_photo_whitelisted(12345) is True
+
+        db_service.remove_photo_verification_whitelist(user_id=12345)
+        assert db_service.is_user_photo_whitelisted(12345) is False
+
+    def test_whitelist_loaded_from_existing_database(self, temp_db, db_service):
+        db_service.add_photo_verification_whitelist(
+            user_id=12345, verified_by_admin_id=99999
+        )
+        reset_database()
+
+        service = init_database(str(temp_db))
+
+        assert service.is_user_photo_whitelisted(12345) is True
@@ -5,307 +5,233 @@ Tests the auto-restriction job and JobQueue integration.
 """
 
 from datetime import UTC, datetime, timedelta
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from telegram.constants import ChatMemberStatus
+from telegram.error import BadRequest, Forbidden, TimedOut
 
 from bot.database.models import UserWarning
 from bot.services.scheduler import auto_restrict_expired_warnings
 
+# Fixed reference time; the database is mocked, so warnings only need
+# plausible timestamps
+NOW = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def make_warning(user_id: int, warning_id: int = 1) -> UserWarning:
+    return UserWarning(
+        id=warning_id,
+        user_id=user_id,
+        group_id=-100999,
+        message_count=1,
+        first_warned_at=NOW - timedelta(hours=4),
+        last_message_at=NOW,
+        is_restricted=False,
+        restricted_by_bot=False,
+    )
+
+
+@pytest.fixture
+def harness(monkeypatch):
+    """Mocked database, bot, job context and settings wired into the scheduler."""
+    ns = SimpleNamespace(
+        db=MagicMock(),
+        bot=AsyncMock(),
+        context=MagicMock(),
+        settings=SimpleNamespace(
+            warning_time_threshold_minutes=180,
+            group_id=-100999,
+            warning_topic_id=123,
+            rules_link="https://example.com/rules",
+        ),
+    )
+    ns.context.bot = ns.bot
+    ns.db.get_warnings_past_time_threshold.return_value = []
+
+    monkeypatch.setattr("bot.services.scheduler.get_database", lambda: ns.db)
+    monkeypatch.setattr("bot.services.scheduler.get_settings", lambda: ns.settings)
+    monkeypatch.setattr(
+        "bot.services.scheduler.BotInfoCache.get_username",
+        AsyncMock(return_value="test_bot"),
+    )
+    return ns
+
 
 class TestAutoRestrictExpiredWarnings:
-    @pytest.mark.asyncio
-    async def test_restricts_expired_warnings(self):
+    async def test_restricts_expired_warnings(self, harness):
         """Test that expired warnings are restricted."""
-        # Mock database with expired warning
-        mock_warning = UserWarning(
-            id=1,
-            user_id=123,
-            group_id=-100999,
-            message_count=1,
-            first_warned_at=datetime.now(UTC) - timedelta(hours=4),
-            last_message_at=datetime.now(UTC),
-            is_restricted=False,
-            restricted_by_bot=False,
-        )
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
 
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = [mock_warning]
-        mock_db.mark_user_restricted = MagicMock()
-
-        # Mock bot
-        mock_bot = AsyncMock()
-        mock_bot.restrict_chat_member = AsyncMock()
-        mock_bot.send_message = AsyncMock()
-
-        # Mock context (JobQueue context)
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
-
-        # Mock settings
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 180
-        mock_settings.group_id = -100999
-        mock_settings.warning_topic_id = 123
-        mock_settings.rules_link = "https://example.com/rules"
-
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                with patch(
-                    "bot.services.scheduler.BotInfoCache.get_username",
-                    new_callable=AsyncMock,
-                    return_value="test_bot",
-                ):
-                    await auto_restrict_expired_warnings(mock_context)
+        await auto_restrict_expired_warnings(harness.context)
 
         # Verify restriction was applied
-        mock_bot.restrict_chat_member.assert_called_once()
-        call_args = mock_bot.restrict_chat_member.call_args
+        harness.bot.restrict_chat_member.assert_called_once()
+        call_args = harness.bot.restrict_chat_member.call_args
         assert call_args.kwargs["chat_id"] == -100999
         assert call_args.kwargs["user_id"] == 123
 
         # Verify database was updated
-        mock_db.mark_user_restricted.assert_called_once_with(123, -100999)
+        harness.db.mark_users_restricted.assert_called_once_with([123], -100999)
 
         # Verify notification was sent
-        mock_bot.send_message.assert_called_once()
-        call_args = mock_bot.send_message.call_args
+        harness.bot.send_message.assert_called_once()
+        call_args = harness.bot.send_message.call_args
         assert call_args.kwargs["chat_id"] == -100999
         assert call_args.kwargs["message_thread_id"] == 123
         assert "dibatasi" in call_args.kwargs["text"]
 
-    @pytest.mark.asyncio
-    async def test_handles_no_expired_warnings(self):
+    async def test_handles_no_expired_warnings(self, harness):
         """Test that function handles empty list gracefully."""
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = []
-
-        mock_bot = AsyncMock()
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
-
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_hours = 3
-
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                await auto_restrict_expired_warnings(mock_context)
+        await auto_restrict_expired_warnings(harness.context)
 
         # Should not call restrict or send message
-        mock_bot.restrict_chat_member.assert_not_called()
-        mock_bot.send_message.assert_not_called()
+        harness.bot.restrict_chat_member.assert_not_called()
+        harness.bot.send_message.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_restricts_multiple_expired_warnings(self):
+    async def test_restricts_multiple_expired_warnings(self, harness):
         """Test that multiple expired warnings are processed."""
-        mock_warnings = [
-            UserWarning(
-                id=1,
-                user_id=123,
-                group_id=-100999,
-                message_count=1,
-                first_warned_at=datetime.now(UTC) - timedelta(hours=4),
-                last_message_at=datetime.now(UTC),
-                is_restricted=False,
-                restricted_by_bot=False,
-            ),
-            UserWarning(
-                id=2,
-                user_id=456,
-                group_id=-100999,
-                message_count=1,
-                first_warned_at=datetime.now(UTC) - timedelta(hours=5),
-                last_message_at=datetime.now(UTC),
-                is_restricted=False,
-                restricted_by_bot=False,
-            ),
+        harness.db.get_warnings_past_time_threshold.return_value = [
+            make_warning(123, warning_id=1),
+            make_warning(456, warning_id=2),
         ]
 
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = mock_warnings
-        mock_db.mark_user_restricted = MagicMock()
-
-        mock_bot = AsyncMock()
-        mock_bot.restrict_chat_member = AsyncMock()
-        mock_bot.send_message = AsyncMock()
-
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
-
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 180
-        mock_settings.group_id = -100999
-        mock_settings.warning_topic_id = 123
-        mock_settings.rules_link = "https://example.com/rules"
-
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                with patch(
-                    "bot.services.scheduler.BotInfoCache.get_username",
-                    new_callable=AsyncMock,
-                    return_value="test_bot",
-                ):
-                    await auto_restrict_expired_warnings(mock_context)
-
-        # Verify both users were restricted
-        assert mock_bot.restrict_chat_member.call_count == 2
-        assert mock_db.mark_user_restricted.call_count == 2
-        assert mock_bot.send_message.call_count == 2
-
-    @pytest.mark.asyncio
-    async def test_handles_restriction_errors(self):
-        """Test that function handles errors gracefully."""
-        mock_warning = UserWarning(
-            id=1,
-            user_id=123,
-            group_id=-100999,
-            message_count=1,
-            first_warned_at=datetime.now(UTC) - timedelta(hours=4),
-            last_message_at=datetime.now(UTC),
-            is_restricted=False,
-            restricted_by_bot=False,
-        )
+        await auto_restrict_expired_warnings(harness.context)
 
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = [mock_warning]
+        # Verify both users were restricted and marked in a single batch
+        assert harness.bot.restrict_chat_member.call_count == 2
+        harness.db.mark_users_restricted.assert_called_once_with([123, 456], -100999)
+        assert harness.bot.send_message.call_count == 2
 
-        mock_bot = AsyncMock()
-        mock_bot.restrict_chat_member = AsyncMock(side_effect=Exception("API error"))
+    async def test_records_restrictions_per_chunk(self, harness, monkeypatch):
+        """Test each chunk is written to the database before the next starts."""
+        monkeypatch.setattr("bot.services.scheduler.MAX_CONCURRENT_RESTRICTIONS", 2)
+        harness.db.get_warnings_past_time_threshold.return_value = [
+            make_warning(user_id, warning_id=i)
+            for i, user_id in enumerate([111, 222, 333], start=1)
+        ]
+        restricted_before_call = []
 
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
+        async def restrict(chat_id, user_id, permissions):
+            restricted_before_call.append(harness.db.mark_users_restricted.call_count)
 
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 180
-        mock_settings.group_id = -100999
+        harness.bot.restrict_chat_member.side_effect = restrict
 
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                # Should not raise, but log the error
-                await auto_restrict_expired_warnings(mock_context)
+        await auto_restrict_expired_warnings(harness.context)
 
-        # Verify restriction was attempted
-        mock_bot.restrict_chat_member.assert_called_once()
+        batches = [c.args[0] for c in harness.db.mark_users_restricted.call_args_list]
+        assert batches == [[111, 222], [333]]
+        # The last user was restricted only after the first chunk was recorded
+        assert restricted_before_call == [0, 0, 1]
 
-    @pytest.mark.asyncio
-    async def test_uses_correct_time_threshold(self):
-        """Test that the correct time threshold from settings is used."""
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = []
+    async def test_handles_restriction_errors(self, harness):
+        """Test that function handles errors gracefully."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
+        harness.bot.restrict_chat_member.side_effect = Exception("API error")
 
-        mock_bot = AsyncMock()
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
+        # Should not raise, but log the error
+        await auto_restrict_expired_warnings(harness.context)
 
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 300  # Different threshold (5 hours)
+        # Verify restriction was attempted but not recorded
+        harness.bot.restrict_chat_member.assert_called_once()
+        harness.db.mark_users_restricted.assert_called_once_with([], -100999)
 
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                await auto_restrict_expired_warnings(mock_context)
+    async def test_error_for_one_user_does_not_stop_others(self, harness):
+        """Test that a failing user doesn't prevent restricting the rest."""
+        harness.db.get_warnings_past_time_threshold.return_value = [
+            make_warning(user_id, warning_id=i)
+            for i, user_id in enumerate([111, 222, 333], start=1)
+        ]
 
-        # Verify correct threshold was passed to database query
-        mock_db.get_warnings_past_time_threshold.assert_called_once_with(300)
+        async def restrict(chat_id, user_id, permissions):
+            if user_id == 222:
+                raise RuntimeError("API error")
 
-    @pytest.mark.asyncio
-    async def test_skips_kicked_user(self):
-        """Test that kicked users are skipped and marked as unrestricted."""
-        mock_warning = UserWarning(
-            id=1,
-            user_id=123,
-            group_id=-100999,
-            message_count=1,
-            first_warned_at=datetime.now(UTC) - timedelta(hours=4),
-            last_message_at=datetime.now(UTC),
-            is_restricted=False,
-            restricted_by_bot=False,
-        )
+        harness.bot.restrict_chat_member.side_effect = restrict
 
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = [mock_warning]
-        mock_db.mark_user_unrestricted = MagicMock()
+        await auto_restrict_expired_warnings(harness.context)
 
-        mock_bot = AsyncMock()
-        mock_bot.restrict_chat_member = AsyncMock()
-        mock_bot.send_message = AsyncMock()
+        assert harness.bot.restrict_chat_member.call_count == 3
+        restricted_ids, group_id = harness.db.mark_users_restricted.call_args.args
+        assert sorted(restricted_ids) == [111, 333]
+        assert group_id == -100999
 
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
+    async def test_expected_api_errors_logged_without_traceback(self, harness, caplog):
+        """Test that Forbidden/BadRequest are logged at info without traceback."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
+        harness.bot.restrict_chat_member.side_effect = Forbidden("Bot was kicked")
 
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 180
-        mock_settings.group_id = -100999
+        caplog.set_level("INFO")
+        await auto_restrict_expired_warnings(harness.context)
 
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                with patch(
-                    "bot.services.scheduler.get_user_status",
-                    new_callable=AsyncMock,
-                    return_value=ChatMemberStatus.BANNED,
-                ):
-                    await auto_restrict_expired_warnings(mock_context)
+        records = [r for r in caplog.records if "Skipped auto-restricting user 123" in r.getMessage()]
+        assert len(records) == 1
+        assert records[0].levelname == "INFO"
+        assert records[0].exc_info is None
+        harness.db.mark_users_restricted.assert_called_once_with([], -100999)
 
-        # Verify user was marked as unrestricted
-        mock_db.mark_user_unrestricted.assert_called_once_with(123, -100999)
+    async def test_uses_correct_time_threshold(self, harness):
+        """Test that the correct time threshold from settings is used."""
+        harness.settings.warning_time_threshold_minutes = 300  # Different threshold (5 hours)
 
-        # Verify restriction was NOT applied
-        mock_bot.restrict_chat_member.assert_not_called()
-        mock_bot.send_message.assert_not_called()
+        await auto_restrict_expired_warnings(harness.context)
 
-    @pytest.mark.asyncio
-    async def test_handles_get_chat_member_failure(self):
-        """Test fallback user mention when get_chat_member fails."""
-        mock_warning = UserWarning(
-            id=1,
-            user_id=123,
-            group_id=-100999,
-            message_count=1,
-            first_warned_at=datetime.now(UTC) - timedelta(hours=4),
-            last_message_at=datetime.now(UTC),
-            is_restricted=False,
-            restricted_by_bot=False,
+        # Verify correct threshold was passed to database query
+        harness.db.get_warnings_past_time_threshold.assert_called_once_with(300)
+
+    async def test_skips_kicked_user(self, harness):
+        """Test that kicked users are skipped and marked as unrestricted."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
+        harness.bot.get_chat_member.return_value = MagicMock(
+            status=ChatMemberStatus.BANNED
         )
 
-        mock_db = MagicMock()
-        mock_db.get_warnings_past_time_threshold.return_value = [mock_warning]
-        mock_db.mark_user_restricted = MagicMock()
+        await auto_restrict_expired_warnings(harness.context)
+
+        # Verify the warning was dropped so later runs skip the user
+        harness.db.delete_users_warnings.assert_called_once_with([123], -100999)
+        harness.db.mark_users_restricted.assert_called_once_with([], -100999)
 
-        mock_bot = AsyncMock()
-        mock_bot.restrict_chat_member = AsyncMock()
-        mock_bot.send_message = AsyncMock()
+        # Verify restriction was NOT applied
+        harness.bot.restrict_chat_member.assert_not_called()
+        harness.bot.send_message.assert_not_called()
+
+    async def test_handles_get_chat_member_failure(self, harness):
+        """Test fallback user mention when get_chat_member fails."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
         # Make get_chat_member raise an exception
-        mock_bot.get_chat_member = AsyncMock(side_effect=Exception("User not found"))
-
-        mock_context = MagicMock()
-        mock_context.bot = mock_bot
-
-        mock_settings = MagicMock()
-        mock_settings.warning_time_threshold_minutes = 180
-        mock_settings.group_id = -100999
-        mock_settings.warning_topic_id = 123
-        mock_settings.rules_link = "https://example.com/rules"
-
-        with patch("bot.services.scheduler.get_database", return_value=mock_db):
-            with patch("bot.services.scheduler.get_settings", return_value=mock_settings):
-                with patch(
-                    "bot.services.scheduler.get_user_status",
-                    new_callable=AsyncMock,
-                    return_value=ChatMemberStatus.MEMBER,
-                ):
-                    with patch(
-                        "bot.services.scheduler.BotInfoCache.get_username",
-                        new_callable=AsyncMock,
-                        return_value="test_bot",
-                    ):
-                        await auto_restrict_expired_warnings(mock_context)
+        harness.bot.get_chat_member.side_effect = BadRequest("User not found")
+
+        await auto_restrict_expired_warnings(harness.context)
 
         # Verify restriction was applied
-        mock_bot.restrict_chat_member.assert_called_once()
+        harness.bot.restrict_chat_member.assert_called_once()
 
         # Verify notification was sent with fallback user mention
-        mock_bot.send_message.assert_called_once()
-        call_args = mock_bot.send_message.call_args
+        harness.bot.send_message.assert_called_once()
+        call_args = harness.bot.send_message.call_args
         assert "User 123" in call_args.kwargs["text"]
 
+    async def test_skips_user_when_get_chat_member_times_out(self, harness):
+        """Test network errors on the member lookup skip the user this run."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
+        harness.bot.get_chat_member.side_effect = TimedOut()
+
+        await auto_restrict_expired_warnings(harness.context)
+
+        harness.bot.restrict_chat_member.assert_not_called()
+        harness.bot.send_message.assert_not_called()
+        harness.db.mark_users_restricted.assert_called_once_with([], -100999)
+
+    async def test_looks_up_member_once_per_warning(self, harness):
+        """Test the member lookup is shared by the kicked check and the mention."""
+        harness.db.get_warnings_past_time_threshold.return_value = [make_warning(123)]
+        mock_member = MagicMock(status=ChatMemberStatus.MEMBER)
+        mock_member.user.username = "someone"
+        harness.bot.get_chat_member.return_value = mock_member
+
+        await auto_restrict_expired_warnings(harness.context)
 
+        harness.bot.get_chat_member.assert_called_once_with(chat_id=-100999, user_id=123)
+        assert "@someone" in harness.bot.send_message.call_args.kwargs["text"]
@@ -30,33 +30,33 @@ class TestGetUserMention:
 
         assert result == "@johndoe"
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_without_username(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_without_username(self, mock_mention_html):
         """Test getting mention for user without username."""
         user = MagicMock(spec=User)
         user.username = None
         user.id = 123456
         user.full_name = "John Doe"
-        mock_mention_markdown.return_value = "[John Doe](tg://user?id=123456)"
+        mock_mention_html.return_value = '<a href="tg://user?id=123456">John Doe</a>'
 
         result = get_user_mention(user)
 
-        mock_mention_markdown.assert_called_once_with(123456, "John Doe", version=2)
-        assert result == "[John Doe](tg://user?id=123456)"
+        mock_mention_html.assert_called_once_with(123456, "John Doe")
+        assert result == '<a href="tg://user?id=123456">John Doe</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_empty_username(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_empty_username(self, mock_mention_html):
         """Test getting mention for user with empty string username."""
         user = MagicMock(spec=User)
         user.username = ""
         user.id = 987654
         user.full_name = "Jane Smith"
-        mock_mention_markdown.return_value = "[Jane Smith](tg://user?id=987654)"
+        mock_mention_html.return_value = '<a href="tg://user?id=987654">Jane Smith</a>'
 
         result = get_user_mention(user)
 
-        mock_mention_markdown.assert_called_once_with(987654, "Jane Smith", version=2)
-        assert result == "[Jane Smith](tg://user?id=987654)"
+        mock_mention_html.assert_called_once_with(987654, "Jane Smith")
+        assert result == '<a href="tg://user?id=987654">Jane Smith</a>'
 
     def test_get_user_mention_special_characters_in_username(self):
         """Test getting mention with special characters in username."""
@@ -69,96 +69,104 @@ class TestGetUserMention:
 
         assert result == "@user_name_123"
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_special_characters_in_full_name(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_special_characters_in_full_name(self, mock_mention_html):
         """Test getting mention with special characters in full name."""
         user = MagicMock(spec=User)
         user.username = None
         user.id = 555666
         user.full_name = "José María"
-        mock_mention_markdown.return_value = "[José María](tg://user?id=555666)"
+        mock_mention_html.return_value = '<a href="tg://user?id=555666">José María</a>'
 
         result = get_user_mention(user)
 
-        mock_mention_markdown.assert_called_once_with(555666, "José María", version=2)
-        assert result == "[José María](tg://user?id=555666)"
+        mock_mention_html.assert_called_once_with(555666, "José María")
+        assert result == '<a href="tg://user?id=555666">José María</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_long_full_name(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_long_full_name(self, mock_mention_html):
         """Test getting mention with very long full name."""
         user = MagicMock(spec=User)
         user.username = None
         user.id = 777888
         user.full_name = "A" * 100
-        mock_mention_markdown.return_value = f"[{'A' * 100}](tg://user?id=777888)"
+        mock_mention_html.return_value = f'<a href="tg://user?id=777888">{"A" * 100}</a>'
 
         result = get_user_mention(user)
 
-        mock_mention_markdown.assert_called_once_with(777888, "A" * 100, version=2)
-        assert result == f"[{'A' * 100}](tg://user?id=777888)"
+        mock_mention_html.assert_called_once_with(777888, "A" * 100)
+        assert result == f'<a href="tg://user?id=777888">{"A" * 100}</a>'
 
 
 class TestGetUserMentionById:
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_basic(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_basic(self, mock_mention_html):
         """Test basic user mention by ID."""
-        mock_mention_markdown.return_value = "[John Doe](tg://user?id=123456)"
+        mock_mention_html.return_value = '<a href="tg://user?id=123456">John Doe</a>'
 
         result = get_user_mention_by_id(123456, "John Doe")
 
-        mock_mention_markdown.assert_called_once_with(123456, "John Doe", version=2)
-        assert result == "[John Doe](tg://user?id=123456)"
+        mock_mention_html.assert_called_once_with(123456, "John Doe")
+        assert result == '<a href="tg://user?id=123456">John Doe</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_large_id(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_large_id(self, mock_mention_html):
         """Test mention by ID with large user ID."""
-        mock_mention_markdown.return_value = "[Jane Smith](tg://user?id=9999999999)"
+        mock_mention_html.return_value = '<a href="tg://user?id=9999999999">Jane Smith</a>'
 
         result = get_user_mention_by_id(9999999999, "Jane Smith")
 
-        mock_mention_markdown.assert_called_once_with(9999999999, "Jane Smith", version=2)
-        assert result == "[Jane Smith](tg://user?id=9999999999)"
+        mock_mention_html.assert_called_once_with(9999999999, "Jane Smith")
+        assert result == '<a href="tg://user?id=9999999999">Jane Smith</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_special_characters(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_special_characters(self, mock_mention_html):
         """Test mention by ID with special characters in name."""
-        mock_mention_markdown.return_value = "[José María](tg://user?id=111222)"
+        mock_mention_html.return_value = '<a href="tg://user?id=111222">José María</a>'
 
         result = get_user_mention_by_id(111222, "José María")
 
-        mock_mention_markdown.assert_called_once_with(111222, "José María", version=2)
-        assert result == "[José María](tg://user?id=111222)"
+        mock_mention_html.assert_called_once_with(111222, "José María")
+        assert result == '<a href="tg://user?id=111222">José María</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_emojis_in_name(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_emojis_in_name(self, mock_mention_html):
         """Test mention by ID with emojis in name."""
-        mock_mention_markdown.return_value = "[User 🎉](tg://user?id=333444)"
+        mock_mention_html.return_value = '<a href="tg://user?id=333444">User 🎉</a>'
 
         result = get_user_mention_by_id(333444, "User 🎉")
 
-        mock_mention_markdown.assert_called_once_with(333444, "User 🎉", version=2)
-        assert result == "[User 🎉](tg://user?id=333444)"
+        mock_mention_html.assert_called_once_with(333444, "User 🎉")
+        assert result == '<a href="tg://user?id=333444">User 🎉</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_long_name(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_long_name(self, mock_mention_html):
         """Test mention by ID with very long name."""
         long_name = "A" * 200
-        mock_mention_markdown.return_value = f"[{long_name}](tg://user?id=555666)"
+        mock_mention_html.return_value = f'<a href="tg://user?id=555666">{long_name}</a>'
 
         result = get_user_mention_by_id(555666, long_name)
 
-        mock_mention_markdown.assert_called_once_with(555666, long_name, version=2)
-        assert result == f"[{long_name}](tg://user?id=555666)"
+        mock_mention_html.assert_called_once_with(555666, long_name)
+        assert result == f'<a href="tg://user?id=555666">{long_name}</a>'
 
-    @patch("bot.services.telegram_utils.mention_markdown")
-    def test_get_user_mention_by_id_single_character_name(self, mock_mention_markdown):
+    @patch("bot.services.telegram_utils.mention_html")
+    def test_get_user_mention_by_id_single_character_name(self, mock_mention_html):
         """Test mention by ID with single character name."""
-        mock_mention_markdown.return_value = "[A](tg://user?id=777888)"
+        mock_mention_html.return_value = '<a href="tg://user?id=777888">A</a>'
 
         result = get_user_mention_by_id(777888, "A")
 
-        mock_mention_markdown.assert_called_once_with(777888, "A", version=2)
-        assert result == "[A](tg://user?id=777888)"
+        mock_mention_html.assert_called_once_with(777888, "A")
+        assert result == '<a href="tg://user?id=777888">A</a>'
+
+    def test_get_user_mention_by_id_escapes_html(self):
+        """Test that HTML special characters in the name are escaped."""
+        result = get_user_mention_by_id(123, "<b>Tom & Jerry</b>")
+
+        assert result == (
+            '<a href="tg://user?id=123">&lt;b&gt;Tom &amp; Jerry&lt;/b&gt;</a>'
+        )
 
 
 class TestUnrestrictUser:
@@ -2,7 +2,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from bot.handlers.topic_guard import guard_warning_topic
+from bot.handlers.topic_guard import WarningTopicFilter, guard_warning_topic
 
 
 @pytest.fixture
@@ -35,6 +35,16 @@ def mock_context():
     return context
 
 
+class TestWarningTopicFilter:
+    def test_matches_warning_topic(self, mock_update):
+        assert WarningTopicFilter(42).filter(mock_update.message) is True
+
+    def test_ignores_other_topic(self, mock_update):
+        mock_update.message.message_thread_id = 7
+
+        assert WarningTopicFilter(42).filter(mock_update.message) is False
+
+
 class TestGuardWarningTopic:
     async def test_no_message(self, mock_context):
         update = MagicMock()
@@ -1,7 +1,11 @@
 from unittest.mock import AsyncMock, MagicMock
 
 
-from bot.services.user_checker import ProfileCheckResult, check_user_profile
+from bot.services.user_checker import (
+    ProfileCheckResult,
+    ProfilePhotoCache,
+    check_user_profile,
+)
 
 
 class TestProfileCheckResult:
@@ -38,6 +42,35 @@ class TestProfileCheckResult:
         assert result.get_missing_items() == ["foto profil publik", "username"]
 
 
+class TestProfilePhotoCache:
+    def test_returns_none_when_missing(self):
+        assert ProfilePhotoCache.get(12345) is None
+
+    def test_returns_cached_value(self):
+        ProfilePhotoCache.set(12345, False)
+
+        assert ProfilePhotoCache.get(12345) is False
+
+    def test_invalidate_removes_entry(self):
+        ProfilePhotoCache.set(12345, True)
+
+        ProfilePhotoCache.invalidate(12345)
+
+        assert ProfilePhotoCache.get(12345) is None
+
+    def test_evicts_oldest_entry_when_full(self, monkeypatch):
+        monkeypatch.setattr(ProfilePhotoCache, "MAX_ENTRIES", 2)
+
+        ProfilePhotoCache.set(1, True)
+        ProfilePhotoCache.set(2, True)
+        ProfilePhotoCache.set(1, True)
+        ProfilePhotoCache.set(3, True)
+
+        assert ProfilePhotoCache.get(1) is True
+        assert ProfilePhotoCache.get(2) is None
+        assert ProfilePhotoCache.get(3) is True
+
+
 class TestCheckUserProfile:
     async def test_user_with_photo_and_username(self):
         from bot.database.service import init_database, reset_database
@@ -167,3 +200,84 @@ class TestCheckUserProfile:
             bot.get_user_profile_photos.assert_not_called()
 
             reset_database()
+
+    async def test_cached_result_skips_api_check(self):
+        import tempfile
+        from pathlib import Path
+
+        from bot.database.service import init_database, reset_database
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            init_database(str(db_path))
+
+            bot = AsyncMock()
+            user = MagicMock()
+            user.id = 12345
+            user.username = "testuser"
+
+            photos = MagicMock()
+            photos.total_count = 1
+            bot.get_user_profile_photos.return_value = photos
+
+            await check_user_profile(bot, user, use_cache=True)
+            result = await check_user_profile(bot, user, use_cache=True)
+
+            assert result.has_profile_photo is True
+            bot.get_user_profile_photos.assert_called_once()
+
+            reset_database()
+
+    async def test_expired_cache_refetches(self, monkeypatch):
+        import tempfile
+        from pathlib import Path
+
+        from bot.database.service import init_database, reset_database
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            init_database(str(db_path))
+            monkeypatch.setattr(ProfilePhotoCache, "TTL_SECONDS", 0)
+
+            bot = AsyncMock()
+            user = MagicMock()
+            user.id = 12345
+            user.username = "testuser"
+
+            photos = MagicMock()
+            photos.total_count = 1
+            bot.get_user_profile_photos.return_value = photos
+
+            await check_user_profile(bot, user, use_cache=True)
+            await check_user_profile(bot, user, use_cache=True)
+
+            assert bot.get_user_profile_photos.call_count == 2
+
+            reset_database()
+
+    async def test_uncached_call_always_checks_api(self):
+        import tempfile
+        from pathlib import Path
+
+        from bot.database.service import init_database, reset_database
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            init_database(str(db_path))
+
+            bot = AsyncMock()
+            user = MagicMock()
+            user.id = 12345
+            user.username = "testuser"
+
+            photos = MagicMock()
+            photos.total_count = 0
+            bot.get_user_profile_photos.return_value = photos
+
+            await check_user_profile(bot, user)
+            await check_user_profile(bot, user)
+
+            assert bot.get_user_profile_photos.call_count == 2
+            assert ProfilePhotoCache.get(12345) is False
+
+            reset_database()
@@ -0,0 +1,22 @@
+from bot.services.user_locks import get_user_lock
+
+
+class TestGetUserLock:
+    def test_same_user_shares_lock(self):
+        lock = get_user_lock(-100999, 123)
+
+        assert get_user_lock(-100999, 123) is lock
+
+    def test_different_users_get_different_locks(self):
+        lock = get_user_lock(-100999, 123)
+
+        assert get_user_lock(-100999, 456) is not lock
+        assert get_user_lock(-100888, 123) is not lock
+
+    async def test_lock_serializes_holders(self):
+        lock = get_user_lock(-100999, 123)
+
+        async with lock:
+            assert get_user_lock(-100999, 123).locked()
+
+        assert not lock.locked()
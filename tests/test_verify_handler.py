@@ -1,21 +1,22 @@
-import tempfile
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from bot.database.service import get_database, init_database, reset_database
+from bot.database.service import get_database
 from bot.handlers.verify import handle_unverify_command, handle_verify_command
 
+pytestmark = pytest.mark.usefixtures("temp_db")
 
-@pytest.fixture(autouse=True)
-def temp_db():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.db"
-        reset_database()  # Reset before init
-        init_database(str(db_path))
-        yield db_path
-        reset_database()
+
+@pytest.fixture
+def mock_settings(monkeypatch):
+    class MockSettings:
+        group_id = -1001234567890
+        warning_topic_id = 12345
+        telegram_bot_token = "fake_token"
+
+    monkeypatch.setattr("bot.handlers.verify.get_settings", lambda: MockSettings())
+    return MockSettings
 
 
 @pytest.fixture
@@ -53,7 +54,7 @@ def mock_context():
     mock_chat.full_name = "Test User"
     context.bot.get_chat.return_value = mock_chat
     
-    context.bot_data = {"admin_ids": [12345]}
+    context.bot_data = {"admin_ids": frozenset({12345})}
     context.args = []
     return context
 
@@ -88,7 +89,7 @@ class TestHandleVerifyCommand:
 
     async def test_non_admin_rejected(self, mock_update, mock_context):
         mock_update.message.from_user.id = 99999
-        mock_context.bot_data = {"admin_ids": [12345]}
+        mock_context.bot_data = {"admin_ids": frozenset({12345})}
         mock_context.args = ["123456"]
 
         await handle_verify_command(mock_update, mock_context)
@@ -141,7 +142,9 @@ class TestHandleVerifyCommand:
         db = get_database()
         assert db.is_user_photo_whitelisted(target_user_id)
 
-    async def test_verify_already_whitelisted_user(self, mock_update, mock_context, temp_db):
+    async def test_verify_already_whitelisted_user(
+        self, mock_update, mock_context, temp_db, mock_settings
+    ):
         target_user_id = 555666
         db = get_database()
         db.add_photo_verification_whitelist(
@@ -156,7 +159,9 @@ class TestHandleVerifyCommand:
         call_args = mock_update.message.reply_text.call_args
         assert "sudah ada di whitelist" in call_args.args[0]
 
-    async def test_verify_multiple_users(self, mock_update, mock_context, temp_db):
+    async def test_verify_multiple_users(
+        self, mock_update, mock_context, temp_db, mock_settings
+    ):
         db = get_database()
 
         # Verify first user
@@ -174,7 +179,7 @@ class TestHandleVerifyCommand:
         assert db.is_user_photo_whitelisted(222222)
 
     async def test_verify_respects_admin_ids(self, mock_update, mock_context):
-        mock_context.bot_data = {"admin_ids": [999, 888]}
+        mock_context.bot_data = {"admin_ids": frozenset({999, 888})}
         mock_update.message.from_user.id = 555  # Not an admin
         mock_context.args = ["123456"]
 
@@ -205,7 +210,9 @@ class TestHandleVerifyCommand:
         db = get_database()
         assert db.is_user_photo_whitelisted(target_user_id)
 
-    async def test_verify_large_user_id(self, mock_update, mock_context, temp_db):
+    async def test_verify_large_user_id(
+        self, mock_update, mock_context, temp_db, mock_settings
+    ):
         large_id = 9999999999
         mock_context.args = [str(large_id)]
 
@@ -250,7 +257,7 @@ class TestHandleVerifyCommand:
 
         # Create some warning records for the user
         db.get_or_create_user_warning(target_user_id, MockSettings.group_id)
-        db.increment_message_count(target_user_id, MockSettings.group_id)
+        db.record_user_message(target_user_id, MockSettings.group_id)
         
         # Verify there's at least one warning
         warning = db.get_or_create_user_warning(target_user_id, MockSettings.group_id)
@@ -296,6 +303,31 @@ class TestHandleVerifyCommand:
         call_args = mock_update.message.reply_text.call_args
         assert "diverifikasi" in call_args.args[0]
 
+    async def test_verify_with_warnings_notifies_when_unrestrict_fails(
+        self, mock_update, mock_context, temp_db, monkeypatch
+    ):
+        """Test that the clearance notice is still sent if unrestricting fails."""
+        from telegram.error import BadRequest
+
+        class MockSettings:
+            group_id = -1001234567890
+            warning_topic_id = 12345
+            telegram_bot_token = "fake_token"
+
+        monkeypatch.setattr("bot.handlers.verify.get_settings", lambda: MockSettings())
+
+        target_user_id = 55555555  # Use unique ID
+        db = get_database()
+        db.get_or_create_user_warning(target_user_id, MockSettings.group_id)
+
+        mock_context.bot.restrict_chat_member.side_effect = BadRequest("User not restricted")
+        mock_context.args = [str(target_user_id)]
+        await handle_verify_command(mock_update, mock_context)
+
+        mock_context.bot.send_message.assert_called_once()
+        mock_update.message.reply_text.assert_called_once()
+        assert "diverifikasi" in mock_update.message.reply_text.call_args.args[0]
+
     async def test_verify_with_warnings_sends_notification_to_topic(
         self, mock_update, mock_context, temp_db, monkeypatch
     ):
@@ -313,8 +345,8 @@ class TestHandleVerifyCommand:
 
         # Create warning records for the user
         db.get_or_create_user_warning(target_user_id, MockSettings.group_id)
-        db.increment_message_count(target_user_id, MockSettings.group_id)
-        db.increment_message_count(target_user_id, MockSettings.group_id)
+        db.record_user_message(target_user_id, MockSettings.group_id)
+        db.record_user_message(target_user_id, MockSettings.group_id)
 
         # Now verify the user
         mock_context.args = [str(target_user_id)]
@@ -325,7 +357,7 @@ class TestHandleVerifyCommand:
         call_args = mock_context.bot.send_message.call_args
         assert call_args.kwargs["chat_id"] == MockSettings.group_id
         assert call_args.kwargs["message_thread_id"] == MockSettings.warning_topic_id
-        assert call_args.kwargs["parse_mode"] == "Markdown"
+        assert call_args.kwargs["parse_mode"] == "HTML"
         # Check the message contains user mention
         assert "Test User" in call_args.kwargs["text"] or str(target_user_id) in call_args.kwargs["text"]
 
@@ -381,7 +413,7 @@ class TestHandleUnverifyCommand:
 
     async def test_non_admin_rejected(self, mock_update, mock_context):
         mock_update.message.from_user.id = 99999
-        mock_context.bot_data = {"admin_ids": [12345]}
+        mock_context.bot_data = {"admin_ids": frozenset({12345})}
         mock_context.args = ["123456"]
 
         await handle_unverify_command(mock_update, mock_context)
@@ -461,7 +493,7 @@ class TestHandleUnverifyCommand:
         db = get_database()
         db.add_photo_verification_whitelist(user_id=555666, verified_by_admin_id=12345)
 
-        mock_context.bot_data = {"admin_ids": [999, 888]}
+        mock_context.bot_data = {"admin_ids": frozenset({999, 888})}
         mock_update.message.from_user.id = 555  # Not an admin
         mock_context.args = ["555666"]
 